@@ -62,6 +62,18 @@ export interface VerifyResult {
   tests: VerifyTestResult[];
 }
 
+type CaseOutcome = { status: { id: number }; stdout?: string | null; stderr?: string | null };
+
+// Pass/fail exactly as runTests() in judge0.ts: trimmed stdout === JSON.stringify(expected)
+function judgeCase(tc: VerifyTestCase, data: CaseOutcome): VerifyTestResult {
+  if (data.status.id === 3) {
+    const got = (data.stdout ?? '').trim();
+    return { description: tc.description, pass: got === JSON.stringify(tc.expected), got, expected: tc.expected };
+  }
+  const got = (data.stderr ?? '').trim() || `Runtime error (status ${data.status.id})`;
+  return { description: tc.description, pass: false, got, expected: tc.expected };
+}
+
 /**
  * Verify that solution_code passes all test cases via the executor.
  * Mirrors runTests() in judge0.ts — same harness, same comparison.
@@ -104,16 +116,87 @@ export async function verifyCodeChallenge(
     if (result.status === 'rejected') {
       return { description: tc.description, pass: false, got: String(result.reason), expected: tc.expected };
     }
-    const data = result.value;
-    const status = data.status as { id: number };
-    if (status.id === 3) {
-      const got = ((data.stdout as string) ?? '').trim();
-      const pass = got === JSON.stringify(tc.expected);
-      return { description: tc.description, pass, got, expected: tc.expected };
-    }
-    const got = ((data.stderr as string) ?? '').trim() || `Runtime error (status ${status.id})`;
-    return { description: tc.description, pass: false, got, expected: tc.expected };
+    return judgeCase(tc, result.value as CaseOutcome);
   });
 
   return { allPassed: tests.every(t => t.pass), tests };
 }
+
+export interface VerifyProblem {
+  id: string;
+  solutionCode: string;
+  entryPoint: string;
+  testCases: VerifyTestCase[];
+}
+
+export interface VerifyProblemResult extends VerifyResult {
+  id: string;
+  queueMs: number;
+  runMs: number;
+}
+
+const JOB_POLL_INTERVAL_MS = 1000;
+
+/**
+ * Verify many code challenges in one executor job (POST /jobs).
+ * The executor runs them in parallel at bulk priority and returns each case's
+ * raw output; pass/fail is judged here as in verifyCodeChallenge(). This scales
+ * with the node's cores instead of the per-user submission limit.
+ */
+export async function verifyCodeChallenges(
+  problems: VerifyProblem[],
+  onProgress?: (completed: number, total: number) => void,
+): Promise<VerifyProblemResult[]> {
+  for (const p of problems) {
+    if (!/^[A-Za-z_][A-Za-z0-9_]*$/.test(p.entryPoint)) {
+      throw new Error(`Invalid entryPoint in ${p.id}: ${p.entryPoint}`);
+    }
+  }
+  const { url, apiKey } = loadEnv();
+
+  const res = await fetch(`${url}/jobs`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'X-Api-Key': apiKey },
+    body: JSON.stringify({
+      problems: problems.map(p => ({
+        id: p.id,
+        solution_code: p.solutionCode,
+        entry_point: p.entryPoint,
+        test_cases: p.testCases.map(tc => ({ description: tc.description, args: tc.args })),
+      })),
+    }),
+  });
+  if (!res.ok) throw new Error(`Executor job error: ${res.status} ${await res.text()}`);
+  const { job_id: jobId } = await res.json() as { job_id: string };
+
+  type JobProblemReport = {
+    id: string;
+    tests: CaseOutcome[];
+    queue_ms: number;
+    run_ms: number;
+  };
+  type JobSummary = { status: string; total: number; completed: number; problems: JobProblemReport[] };
+
+  for (;;) {
+    const poll = await fetch(`${url}/jobs/${jobId}`, { headers: { 'X-Api-Key': apiKey } });
+    if (!poll.ok) throw new Error(`Executor job poll error: ${poll.status}`);
+    const job = await poll.json() as JobSummary;
+    onProgress?.(job.completed, job.total);
+    if (job.status === 'done') {
+      const byId = new Map(job.problems.map(p => [p.id, p]));
+      return problems.map(p => {
+        const report = byId.get(p.id);
+        if (!report) throw new Error(`Executor job returned no report for ${p.id}`);
+        const tests = p.testCases.map((tc, i) => judgeCase(tc, report.tests[i]));
+        return {
+          id: p.id,
+          allPassed: tests.every(t => t.pass),
+          tests,
+          queueMs: report.queue_ms,
+          runMs: report.run_ms,
+        };
+      });
+    }
+    await new Promise<void>(r => setTimeout(r, JOB_POLL_INTERVAL_MS));
+  }
+}
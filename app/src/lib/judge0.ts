@@ -79,7 +79,7 @@ async function pollResult(token: string): Promise<Record<string, unknown>> {
     const data = await res.json() as Record<string, unknown>;
     const status = data.status as { id: number; description: string };
 
-    // status.id >= 3 means done (3=Accepted, 5=TLE, 11=Runtime Error, 13=Internal Error)
+    // status.id >= 3 means done (3=Accepted, 5=TLE, 8=Output Limit, 11=Runtime Error, 13=Internal Error)
     if (status.id >= 3) return data;
 
     await new Promise<void>(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
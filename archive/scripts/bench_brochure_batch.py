@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure batch brochure generation across worker counts.
+Usage: python bench_brochure_batch.py [variants] [max_workers]
+Writes `variants` personalized brochures into a temp dir with a cold page
+cache for each run and reports PDFs/s, speedup over one worker and speedup
+per core. The "serial" row renders every page of every copy on one canvas,
+as create_brochure() did before the page cache.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+import generate_brochure_pdf as brochure
+
+
+def write_variants(path, count):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "name", "whatsapp", "price"])
+        writer.writeheader()
+        for n in range(count):
+            writer.writerow({
+                "id": f"lead-{n:04d}",
+                "name": f"Lead {n:04d}",
+                "whatsapp": f"+91 90000 {n:05d}",
+                "price": f"Rs. {2000 + 500 * (n % 4):,}",  # four cohorts' prices
+            })
+
+
+def serial(variants_path, output_dir):
+    content = brochure.load_content()
+    variants = brochure.load_variants(variants_path)
+    start = time.perf_counter()
+    for n, variant in enumerate(variants, 1):
+        c = canvas.Canvas(os.path.join(output_dir, brochure.variant_filename(variant, n)), pagesize=A4)
+        for page in brochure.apply_variant(content, variant)['pages']:
+            brochure.TEMPLATES[page['template']](c, page)
+        c.save()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        variants_path = os.path.join(tmp, "variants.csv")
+        write_variants(variants_path, count)
+
+        rows = [("serial", 1, serial(variants_path, tmp))]
+        workers = 1
+        while workers <= max_workers:
+            run = os.path.join(tmp, f"w{workers}")
+            _, seconds = brochure.create_batch(variants_path, run, cache_dir=os.path.join(run, "cache"), workers=workers)
+            rows.append(("batch", workers, seconds))
+            workers *= 2
+
+    base = rows[1][2]
+    print(f"\n{count} PDFs, {os.cpu_count()} cores")
+    print(f"{'mode':<8}{'workers':>8}{'PDFs/s':>9}{'speedup':>9}{'per core':>10}")
+    for mode, workers, seconds in rows:
+        speedup = base / seconds
+        print(f"{mode:<8}{workers:>8}{count / seconds:>9.1f}{speedup:>8.2f}x{speedup / workers:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
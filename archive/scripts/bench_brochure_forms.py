@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Measure the brochure with repeated elements inlined vs shared as Form XObjects.
+Usage: python bench_brochure_forms.py [copies] [repeat]
+"pipeline" is the real build: each page rendered on its own canvas into a
+cold page cache, then spliced, so a form is never shared across pages.
+"one canvas" renders the six pages `copies` times into a single PDF, the
+only layout where forms are reused. Reports file size and best-of-`repeat`
+generation time.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+import generate_brochure_pdf as brochure
+
+PAGES = brochure.load_content()['pages']
+
+
+def build(tmp):
+    """The create_brochure() pipeline with a cold cache; returns the PDF."""
+    cache_dir = tempfile.mkdtemp(dir=tmp)
+    output = os.path.join(cache_dir, "brochure.pdf")
+    paths, _ = brochure.render_pages(PAGES, cache_dir)
+    brochure.splice(paths, output)
+    with open(output, "rb") as f:
+        return f.read()
+
+
+def render(copies):
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    for _ in range(copies):
+        for page in PAGES:
+            brochure.TEMPLATES[page['template']](c, page)
+    c.save()
+    return buf.getvalue()
+
+
+def measure(use_forms, repeat, make):
+    brochure.USE_FORMS = use_forms
+    brochure.cached_page.cache_clear()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pdf = make()
+        best = min(best, time.perf_counter() - start)
+    return len(pdf), best
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"best of {repeat}")
+    print(f"{'':<28}{'bytes':>10}{'ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, make in (
+            (f"pipeline, {len(PAGES)} pages", lambda: build(tmp)),
+            (f"one canvas, {copies * len(PAGES)} pages", lambda: render(copies)),
+        ):
+            for mode, use_forms in (("inline", False), ("forms", True)):
+                size, seconds = measure(use_forms, repeat, make)
+                print(f"{label + ' ' + mode:<28}{size:>10}{seconds * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
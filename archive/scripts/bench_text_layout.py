@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark line breaking: the old re-measure-the-whole-line loop vs text_layout.
+Usage: python bench_text_layout.py [repeat]
+"""
+
+import random
+import sys
+import time
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from text_layout import WidthCache, break_lines
+
+WORDS = (
+    "automation workflow trigger node data instincts operations AI-native professional "
+    "quadrant theory pattern guidance application production monitoring resilient "
+    "a an the of to and is in for with — compound career"
+).split()
+
+
+def old_break_lines(text, max_width, font, size):
+    """The previous draw_wrapped_text() loop, without drawing."""
+    lines = []
+    line = ""
+    for word in text.split():
+        test_line = (line + " " + word).strip()
+        if stringWidth(test_line, font, size) <= max_width:
+            line = test_line
+        else:
+            if line:
+                lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rng = random.Random(0)
+    font, size = 'Helvetica', 11
+    print(f"{'words':>7} {'width':>6} {'old ms':>9} {'cold ms':>9} {'warm ms':>9} {'speedup':>8}")
+    for n_words in (100, 1000, 5000):
+        text = " ".join(rng.choice(WORDS) for _ in range(n_words))
+        for max_width in (160.0, 505.0, 2000.0):
+            old = old_break_lines(text, max_width, font, size)
+            new = [line for line, _ in break_lines(text, max_width, font, size, WidthCache())]
+            assert old == new, "line breaks differ"
+            t_old = best_of(repeat, lambda: old_break_lines(text, max_width, font, size))
+            t_cold = best_of(repeat, lambda: break_lines(text, max_width, font, size, WidthCache()))
+            warm = WidthCache()
+            t_warm = best_of(repeat, lambda: break_lines(text, max_width, font, size, warm))
+            print(f"{n_words:>7} {max_width:>6.0f} {t_old * 1000:>9.2f} {t_cold * 1000:>9.2f} "
+                  f"{t_warm * 1000:>9.2f} {t_old / t_warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
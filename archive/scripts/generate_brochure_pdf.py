@@ -2,6 +2,7 @@
 """
 Generate a PDF brochure for zuzu.codes using the website design system.
 Design: Light mode with cream backgrounds, dark goldenrod accent (#B8860B)
+Requires reportlab and pypdf: pip install -r requirements.txt
 """
 
 from reportlab.lib.pagesizes import A4
@@ -10,7 +11,20 @@ from reportlab.lib.colors import HexColor
 from reportlab.pdfgen import canvas
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.platypus import Paragraph
+from pypdf import PdfReader, PdfWriter
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import copy
+import csv
+import functools
+import hashlib
+import json
 import os
+import re
+import time
+import weakref
+
+from text_layout import draw_lines, layout_paragraph, text_width
 
 # Design System Colors
 COLORS = {
@@ -30,32 +44,69 @@ PAGE_WIDTH, PAGE_HEIGHT = A4
 MARGIN = 45
 CONTENT_WIDTH = PAGE_WIDTH - (MARGIN * 2)
 
+# Opt-in: draw repeated elements once into a Form XObject and reference it after
+# that. Forms cost more than they save on a six-page brochure (12 KB inline vs
+# 17 KB, and slower); they pay off only when many pages share one canvas, as in
+# bench_brochure_forms.py with 100+ pages.
+USE_FORMS = False
+_forms = weakref.WeakKeyDictionary()  # canvas -> {element key: form name}
+
+
+def place_form(c, key, bbox, draw, x=0, y=0):
+    """Draw `draw(c)` at (x, y), via one shared Form XObject per key.
+
+    `draw` works in local coordinates inside `bbox` (lower-x, lower-y, upper-x, upper-y).
+    """
+    if not USE_FORMS:
+        c.saveState()
+        c.translate(x, y)
+        draw(c)
+        c.restoreState()
+        return
+    names = _forms.setdefault(c, {})
+    name = names.get(key)
+    if name is None:
+        name = names[key] = f"zz{len(names)}"
+        c.beginForm(name, *bbox)
+        draw(c)
+        c.endForm()
+    c.saveState()
+    c.translate(x, y)
+    c.doForm(name)
+    c.restoreState()
+
 
 def draw_page_background(c, color):
     """Fill page with background color."""
-    c.setFillColor(color)
-    c.rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT, fill=True, stroke=False)
+    def draw(c):
+        c.setFillColor(color)
+        c.rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT, fill=True, stroke=False)
+
+    place_form(c, ('background', color.hexval()), (0, 0, PAGE_WIDTH, PAGE_HEIGHT), draw)
 
 
 def draw_tag(c, text, x, y, centered=False):
     """Draw a styled tag element."""
     text_upper = text.upper()
-    text_width = c.stringWidth(text_upper, 'Helvetica-Bold', 9)
+    label_width = text_width(text_upper, 'Helvetica-Bold', 9)
     padding_x = 12
+    tag_width = label_width + padding_x * 2
 
     if centered:
-        x = x - (text_width + padding_x * 2) / 2
+        x = x - tag_width / 2
 
-    # Background
-    c.setFillColor(COLORS['accent_soft'])
-    c.roundRect(x, y - 6, text_width + padding_x * 2, 20, 10, fill=True, stroke=False)
+    def draw(c):
+        # Background
+        c.setFillColor(COLORS['accent_soft'])
+        c.roundRect(0, -6, tag_width, 20, 10, fill=True, stroke=False)
 
-    # Text
-    c.setFillColor(COLORS['accent'])
-    c.setFont('Helvetica-Bold', 9)
-    c.drawString(x + padding_x, y + 2, text_upper)
+        # Text
+        c.setFillColor(COLORS['accent'])
+        c.setFont('Helvetica-Bold', 9)
+        c.drawString(padding_x, 2, text_upper)
 
-    return text_width + padding_x * 2
+    place_form(c, ('tag', text_upper), (0, -6, tag_width, 14), draw, x, y)
+    return tag_width
 
 
 def draw_wrapped_text(c, text, x, y, max_width, font='Helvetica', size=11, color=None, centered=False):
@@ -63,119 +114,109 @@ def draw_wrapped_text(c, text, x, y, max_width, font='Helvetica', size=11, color
     if color is None:
         color = COLORS['text_secondary']
 
-    c.setFillColor(color)
-    c.setFont(font, size)
-
-    words = text.split()
-    lines = []
-    line = ""
-
-    for word in words:
-        test_line = (line + " " + word).strip()
-        if c.stringWidth(test_line, font, size) <= max_width:
-            line = test_line
-        else:
-            if line:
-                lines.append(line)
-            line = word
-    if line:
-        lines.append(line)
-
-    line_height = size * 1.4
-    for line_text in lines:
-        if centered:
-            c.drawCentredString(x, y, line_text)
-        else:
-            c.drawString(x, y, line_text)
-        y -= line_height
-
+    boxes, y = layout_paragraph(text, x, y, max_width, font, size, centered=centered)
+    draw_lines(c, boxes, font, size, color)
     return y
 
 
 def draw_divider(c, x, y, width):
     """Draw a horizontal divider line."""
-    c.setStrokeColor(COLORS['border'])
-    c.setLineWidth(0.5)
-    c.line(x, y, x + width, y)
+    def draw(c):
+        c.setStrokeColor(COLORS['border'])
+        c.setLineWidth(0.5)
+        c.line(0, 0, width, 0)
+
+    place_form(c, ('divider', width), (0, -1, width, 1), draw, x, y)
 
 
 def draw_logo(c, x, y, size=18, centered=False):
     """Draw the zuzu.codes logo."""
     c.setFont('Helvetica', size)
-    zuzu_w = c.stringWidth("zuzu", 'Helvetica', size)
-    dot_w = c.stringWidth(".", 'Helvetica', size)
-    codes_w = c.stringWidth("codes", 'Helvetica', size)
+    zuzu_w = text_width("zuzu", 'Helvetica', size)
+    dot_w = text_width(".", 'Helvetica', size)
+    codes_w = text_width("codes", 'Helvetica', size)
     total_w = zuzu_w + dot_w + codes_w
 
     if centered:
         x = x - total_w / 2
 
-    c.setFillColor(COLORS['text_primary'])
-    c.drawString(x, y, "zuzu")
-    c.setFillColor(COLORS['accent'])
-    c.drawString(x + zuzu_w, y, ".")
-    c.setFillColor(COLORS['text_primary'])
-    c.drawString(x + zuzu_w + dot_w, y, "codes")
+    def draw(c):
+        c.setFont('Helvetica', size)
+        c.setFillColor(COLORS['text_primary'])
+        c.drawString(0, 0, "zuzu")
+        c.setFillColor(COLORS['accent'])
+        c.drawString(zuzu_w, 0, ".")
+        c.setFillColor(COLORS['text_primary'])
+        c.drawString(zuzu_w + dot_w, 0, "codes")
+
+    place_form(c, ('logo', size), (0, -size * 0.25, total_w, size), draw, x, y)
 
 
 # =============================================
-# PAGE 1: Cover / The Shift
+# PAGE TEMPLATES
+# Each renders one page from its entry in the content file.
+# Bump a template's version when its drawing code changes; STYLE_VERSION
+# covers the shared helpers and design system above.
 # =============================================
-def draw_page_1(c):
-    draw_page_background(c, COLORS['bg_primary'])
+STYLE_VERSION = 1
+TEMPLATE_VERSIONS = {
+    'cover': 2,
+    'quadrants': 1,
+    'numbered_list': 1,
+    'courses': 1,
+    'pricing': 1,
+    'about': 1,
+}
+
+
+def render_cover(c, page):
+    draw_page_background(c, COLORS[page['background']])
 
     y = PAGE_HEIGHT - 100
-    draw_tag(c, "The New Professional Baseline", MARGIN, y)
+    draw_tag(c, page['tag'], MARGIN, y)
 
     # Headline
     y -= 55
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Times-Roman', 40)
-    c.drawString(MARGIN, y, "AI-native upskilling")
-    y -= 48
-    c.drawString(MARGIN, y, "for the modern")
-    y -= 48
-    c.drawString(MARGIN, y, "professional")
+    for i, line in enumerate(page['headline']):
+        if i:
+            y -= 48
+        c.drawString(MARGIN, y, line)
 
     # Body paragraphs
     y -= 50
-
-    paras = [
-        ("AI-native tools are no longer optional. They're the new professional baseline.", COLORS['text_secondary']),
-        ("But there's a gap. MBAs teach strategy. Bootcamps teach tools. Neither teaches AI-native operations thinking — the instinct to identify, design, and manage automated processes.", COLORS['text_secondary']),
-        ("Surface-level tool familiarity isn't enough. The professionals who master AI-native automation management become force multipliers — personally and organizationally.", COLORS['text_secondary']),
-    ]
-
-    for text, color in paras:
-        y = draw_wrapped_text(c, text, MARGIN, y, CONTENT_WIDTH, 'Helvetica', 12, color)
+    for text in page['paragraphs']:
+        y = draw_wrapped_text(c, text, MARGIN, y, CONTENT_WIDTH, 'Helvetica', 12, COLORS['text_secondary'])
         y -= 12
 
     # Logo at bottom
     draw_logo(c, MARGIN, 50, 18)
 
+    # Personalized copies name their recipient opposite the logo
+    if page.get('prepared_for'):
+        c.setFillColor(COLORS['text_muted'])
+        c.setFont('Helvetica', 10)
+        c.drawRightString(PAGE_WIDTH - MARGIN, 50, f"Prepared for {page['prepared_for']}")
+
     c.showPage()
 
 
-# =============================================
-# PAGE 2: The Zuzu Method
-# =============================================
-def draw_page_2(c):
-    draw_page_background(c, COLORS['bg_surface'])
+def render_quadrants(c, page):
+    draw_page_background(c, COLORS[page['background']])
 
     y = PAGE_HEIGHT - 90
-    draw_tag(c, "The Zuzu Method", MARGIN, y)
+    draw_tag(c, page['tag'], MARGIN, y)
 
     # Headline
     y -= 45
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Times-Roman', 30)
-    c.drawString(MARGIN, y, "We don't teach tools. We build instincts.")
+    c.drawString(MARGIN, y, page['headline'])
 
     # Subheading
     y -= 35
-    y = draw_wrapped_text(c,
-        "Every topic traverses four quadrants — a complete learning cycle that produces deep, transferable competence.",
-        MARGIN, y, CONTENT_WIDTH, 'Helvetica', 11, COLORS['text_secondary'])
+    y = draw_wrapped_text(c, page['intro'], MARGIN, y, CONTENT_WIDTH, 'Helvetica', 11, COLORS['text_secondary'])
 
     # 2x2 Grid
     y -= 30
@@ -183,15 +224,8 @@ def draw_page_2(c):
     grid_width = (CONTENT_WIDTH - grid_gap) / 2
     grid_height = 90
 
-    quadrants = [
-        ("01", "Core Theory", "Principles and mental models that transfer"),
-        ("02", "Pattern Recognition", "Real-world cases with expert analysis"),
-        ("03", "Independent Application", "Build it yourself, make mistakes, learn"),
-        ("04", "Expert Guidance", "Feedback and refinement from practitioners"),
-    ]
-
     grid_top = y
-    for i, (num, title, desc) in enumerate(quadrants):
+    for i, quadrant in enumerate(page['quadrants']):
         row = i // 2
         col = i % 2
         cell_x = MARGIN + col * (grid_width + grid_gap)
@@ -206,32 +240,26 @@ def draw_page_2(c):
         # Number
         c.setFillColor(COLORS['accent'])
         c.setFont('Courier', 10)
-        c.drawString(cell_x + 12, cell_y - 20, num)
+        c.drawString(cell_x + 12, cell_y - 20, quadrant['number'])
 
         # Title
         c.setFillColor(COLORS['text_primary'])
         c.setFont('Helvetica-Bold', 13)
-        c.drawString(cell_x + 12, cell_y - 38, title)
+        c.drawString(cell_x + 12, cell_y - 38, quadrant['title'])
 
         # Description
-        draw_wrapped_text(c, desc, cell_x + 12, cell_y - 55, grid_width - 24, 'Helvetica', 10, COLORS['text_secondary'])
+        draw_wrapped_text(c, quadrant['description'], cell_x + 12, cell_y - 55, grid_width - 24, 'Helvetica', 10, COLORS['text_secondary'])
 
     # Why it works
-    y = grid_top - 2 * (grid_height + grid_gap) - 35
+    rows = (len(page['quadrants']) + 1) // 2
+    y = grid_top - rows * (grid_height + grid_gap) - 35
 
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Helvetica-Bold', 13)
-    c.drawString(MARGIN, y, "Why this works")
+    c.drawString(MARGIN, y, page['points_title'])
 
     y -= 25
-    why_points = [
-        "Theory without application fades.",
-        "Application without theory is imitation.",
-        "Independence without guidance plateaus.",
-        "Guidance without independence creates dependency.",
-    ]
-
-    for point in why_points:
+    for point in page['points']:
         c.setFillColor(COLORS['accent'])
         c.circle(MARGIN + 4, y + 3, 3, fill=True, stroke=False)
         c.setFillColor(COLORS['text_secondary'])
@@ -243,239 +271,141 @@ def draw_page_2(c):
     y -= 15
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Helvetica-Bold', 12)
-    c.drawString(MARGIN, y, "Complete the quadrant. Build lasting competence.")
+    c.drawString(MARGIN, y, page['tagline'])
 
     c.showPage()
 
 
-# =============================================
-# PAGE 3: Who This Is For
-# =============================================
-def draw_page_3(c):
-    draw_page_background(c, COLORS['bg_primary'])
+def render_numbered_list(c, page):
+    draw_page_background(c, COLORS[page['background']])
 
     y = PAGE_HEIGHT - 90
-    draw_tag(c, "Who This Is For", MARGIN, y)
+    draw_tag(c, page['tag'], MARGIN, y)
 
     # Headline
     y -= 45
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Times-Roman', 30)
-    c.drawString(MARGIN, y, "Built for professionals who want more.")
+    c.drawString(MARGIN, y, page['headline'])
 
     y -= 55
 
-    audiences = [
-        ("01", "Career-focused professionals", "seeking AI-native skills that compound over time."),
-        ("02", "Founders and operators", "who treat productivity as competitive advantage."),
-        ("03", "Team leads", "building automation-first cultures."),
-        ("04", "Consultants", "adding process optimization to their practice."),
-    ]
-
-    for i, (num, title, desc) in enumerate(audiences):
+    items = page['items']
+    for i, item in enumerate(items):
         # Number
         c.setFillColor(COLORS['accent'])
         c.setFont('Courier', 14)
-        c.drawString(MARGIN, y, num)
+        c.drawString(MARGIN, y, item['number'])
 
         # Title
         c.setFillColor(COLORS['text_primary'])
         c.setFont('Helvetica-Bold', 12)
-        c.drawString(MARGIN + 35, y, title)
+        c.drawString(MARGIN + 35, y, item['title'])
 
         # Description
         c.setFillColor(COLORS['text_secondary'])
         c.setFont('Helvetica', 12)
-        title_w = c.stringWidth(title + " ", 'Helvetica-Bold', 12)
-        c.drawString(MARGIN + 35 + title_w, y, desc)
+        title_w = text_width(item['title'] + " ", 'Helvetica-Bold', 12)
+        c.drawString(MARGIN + 35 + title_w, y, item['description'])
 
         y -= 25
-        if i < len(audiences) - 1:
+        if i < len(items) - 1:
             draw_divider(c, MARGIN + 35, y + 5, CONTENT_WIDTH - 35)
         y -= 25
 
-    # MBA parallel
+    # Closing statement, last line in the accent colour
     y -= 20
     draw_divider(c, MARGIN, y + 15, CONTENT_WIDTH)
 
     y -= 15
     c.setFillColor(COLORS['text_secondary'])
     c.setFont('Times-Italic', 13)
-    c.drawCentredString(PAGE_WIDTH / 2, y, "Like an MBA provides frameworks for business thinking,")
-    y -= 20
-    c.drawCentredString(PAGE_WIDTH / 2, y, "this curriculum provides frameworks for")
-    y -= 20
-    c.setFillColor(COLORS['accent'])
-    c.drawCentredString(PAGE_WIDTH / 2, y, "AI-native operations thinking.")
+    for i, line in enumerate(page['closing']):
+        if i:
+            y -= 20
+        if i == len(page['closing']) - 1:
+            c.setFillColor(COLORS['accent'])
+        c.drawCentredString(PAGE_WIDTH / 2, y, line)
 
     c.showPage()
 
 
-# =============================================
-# PAGE 4: The Courses
-# =============================================
-def draw_page_4(c):
-    draw_page_background(c, COLORS['bg_surface'])
+def render_courses(c, page):
+    draw_page_background(c, COLORS[page['background']])
 
     y = PAGE_HEIGHT - 70
-    draw_tag(c, "The Courses", MARGIN, y)
-
-    # Course 1
-    y -= 40
-    c.setFillColor(COLORS['text_primary'])
-    c.setFont('Times-Roman', 22)
-    c.drawString(MARGIN, y, "Course 1: Personal Productivity")
+    draw_tag(c, page['tag'], MARGIN, y)
 
-    y -= 22
-    c.setFillColor(COLORS['text_secondary'])
-    c.setFont('Times-Italic', 10)
-    c.drawString(MARGIN, y, "From manual processes → to systematized personal operations that run themselves.")
-
-    y -= 28
-
-    modules_1 = [
-        ("Module 1: First Principles", "How automation thinks",
-         ["Introduction to Workflow Thinking", "Your First Automation", "Connecting Services", "Working with Data"]),
-        ("Module 2: Building Blocks", "The patterns behind every workflow",
-         ["Triggers and Schedules", "When Things Go Wrong", "Complex Data Structures", "Processing Different Formats"]),
-        ("Module 3: Production Ready", "From working to reliable",
-         ["Building Resilient Workflows", "Multi-Step Architectures", "Monitoring What You Build", "Going to Production"]),
-    ]
+    for i, course in enumerate(page['courses']):
+        if i == 0:
+            y -= 40
+        else:
+            # Divider
+            y -= 5
+            draw_divider(c, MARGIN, y, CONTENT_WIDTH)
+            y -= 20
 
-    for title, subtitle, lessons in modules_1:
         c.setFillColor(COLORS['text_primary'])
-        c.setFont('Helvetica-Bold', 11)
-        c.drawString(MARGIN, y, title)
-        c.setFillColor(COLORS['text_muted'])
-        c.setFont('Helvetica', 9)
-        c.drawString(MARGIN + c.stringWidth(title + "  ", 'Helvetica-Bold', 11), y, f"— {subtitle}")
-        y -= 15
-        for lesson in lessons:
-            c.setFillColor(COLORS['text_secondary'])
-            c.setFont('Helvetica', 9)
-            c.drawString(MARGIN + 12, y, f"• {lesson}")
-            y -= 12
-        y -= 8
+        c.setFont('Times-Roman', 22)
+        c.drawString(MARGIN, y, course['title'])
 
-    # Divider
-    y -= 5
-    draw_divider(c, MARGIN, y, CONTENT_WIDTH)
-    y -= 20
-
-    # Course 2
-    c.setFillColor(COLORS['text_primary'])
-    c.setFont('Times-Roman', 22)
-    c.drawString(MARGIN, y, "Course 2: Business Operations")
-
-    y -= 22
-    c.setFillColor(COLORS['text_secondary'])
-    c.setFont('Times-Italic', 10)
-    c.drawString(MARGIN, y, "From individual competence → to organizational capability across teams and systems.")
-
-    y -= 28
+        y -= 22
+        c.setFillColor(COLORS['text_secondary'])
+        c.setFont('Times-Italic', 10)
+        c.drawString(MARGIN, y, course['summary'])
 
-    modules_2 = [
-        ("Module 1: Process Design", "From business need to automation blueprint",
-         ["Mapping Processes", "Finding Automation Opportunities", "Building the Business Case", "Designing for Scale"]),
-        ("Module 2: Enterprise Integrations", "Connecting the systems that run your business",
-         ["CRM Workflows", "Finance and Operations", "Working with Databases", "Communication Flows"]),
-        ("Module 3: Production & Compliance", "Automations that organizations can trust",
-         ["Security and Access", "Audit and Recovery", "Performance at Scale", "Maintenance and Evolution"]),
-    ]
+        y -= 28
 
-    for title, subtitle, lessons in modules_2:
-        c.setFillColor(COLORS['text_primary'])
-        c.setFont('Helvetica-Bold', 11)
-        c.drawString(MARGIN, y, title)
-        c.setFillColor(COLORS['text_muted'])
-        c.setFont('Helvetica', 9)
-        c.drawString(MARGIN + c.stringWidth(title + "  ", 'Helvetica-Bold', 11), y, f"— {subtitle}")
-        y -= 15
-        for lesson in lessons:
-            c.setFillColor(COLORS['text_secondary'])
+        for module in course['modules']:
+            title = module['title']
+            c.setFillColor(COLORS['text_primary'])
+            c.setFont('Helvetica-Bold', 11)
+            c.drawString(MARGIN, y, title)
+            c.setFillColor(COLORS['text_muted'])
             c.setFont('Helvetica', 9)
-            c.drawString(MARGIN + 12, y, f"• {lesson}")
-            y -= 12
-        y -= 8
+            c.drawString(MARGIN + text_width(title + "  ", 'Helvetica-Bold', 11), y, f"— {module['subtitle']}")
+            y -= 15
+            for lesson in module['lessons']:
+                c.setFillColor(COLORS['text_secondary'])
+                c.setFont('Helvetica', 9)
+                c.drawString(MARGIN + 12, y, f"• {lesson}")
+                y -= 12
+            y -= 8
 
     c.showPage()
 
 
-# =============================================
-# PAGE 5: Pricing
-# =============================================
-def draw_page_5(c):
-    draw_page_background(c, COLORS['bg_primary'])
+def render_pricing(c, page):
+    draw_page_background(c, COLORS[page['background']])
 
     y = PAGE_HEIGHT - 80
-    draw_tag(c, "Pricing", MARGIN, y)
+    draw_tag(c, page['tag'], MARGIN, y)
 
     # Headline
     y -= 40
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Times-Roman', 28)
-    c.drawString(MARGIN, y, "Choose your depth")
+    c.drawString(MARGIN, y, page['headline'])
 
     y -= 25
     c.setFillColor(COLORS['text_secondary'])
     c.setFont('Helvetica', 11)
-    c.drawString(MARGIN, y, "Cohort-based learning with fixed timelines, peer accountability, and structured progression.")
+    c.drawString(MARGIN, y, page['intro'])
 
     y -= 18
     c.setFillColor(COLORS['text_muted'])
     c.setFont('Helvetica', 9)
-    c.drawString(MARGIN, y, "Higher tiers = deeper engagement at each stage")
+    c.drawString(MARGIN, y, page['note'])
 
     # Pricing cards - clean layout
     y -= 40
 
+    tiers = page['tiers']
     card_gap = 12
-    card_width = (CONTENT_WIDTH - card_gap * 2) / 3
+    card_width = (CONTENT_WIDTH - card_gap * (len(tiers) - 1)) / len(tiers)
     card_height = 340
     card_top = y
 
-    tiers = [
-        {
-            "name": "Essential",
-            "desc": "Self-paced learning with community support",
-            "price": None,
-            "featured": False,
-            "features": [
-                ("Theory", "Self-paced"),
-                ("Patterns", "Library"),
-                ("Application", "Self-directed"),
-                ("Guidance", "Community"),
-            ],
-            "cta": "Contact Us"
-        },
-        {
-            "name": "Pro",
-            "desc": "Enhanced learning with live instruction",
-            "price": "Rs. 3,000",
-            "featured": True,
-            "features": [
-                ("Theory", "Enhanced"),
-                ("Patterns", "+ Live"),
-                ("Application", "+ Structured"),
-                ("Guidance", "+ Instructor"),
-            ],
-            "cta": "Contact Us"
-        },
-        {
-            "name": "Premium",
-            "desc": "Deep, personalized learning experience",
-            "price": None,
-            "featured": False,
-            "features": [
-                ("Theory", "Deep dive"),
-                ("Patterns", "+ Expert"),
-                ("Application", "+ Personal"),
-                ("Guidance", "+ 1:1"),
-            ],
-            "cta": "Contact Us"
-        },
-    ]
-
     for i, tier in enumerate(tiers):
         card_x = MARGIN + i * (card_width + card_gap)
 
@@ -530,23 +460,8 @@ def draw_page_5(c):
             text_y -= 22
 
         # Description
-        c.setFillColor(COLORS['text_secondary'])
-        c.setFont('Helvetica', 9)
-        desc_lines = []
-        words = tier["desc"].split()
-        line = ""
-        for word in words:
-            test = (line + " " + word).strip()
-            if c.stringWidth(test, 'Helvetica', 9) < card_width - padding * 2:
-                line = test
-            else:
-                desc_lines.append(line)
-                line = word
-        if line:
-            desc_lines.append(line)
-        for dl in desc_lines:
-            c.drawString(text_x, text_y, dl)
-            text_y -= 13
+        boxes, text_y = layout_paragraph(tier["desc"], text_x, text_y, card_width - padding * 2, 'Helvetica', 9, leading=13)
+        draw_lines(c, boxes, 'Helvetica', 9, COLORS['text_secondary'])
 
         # Features - stacked vertically for clarity
         text_y -= 18
@@ -587,48 +502,23 @@ def draw_page_5(c):
     y = card_top - card_height - 45
     c.setFillColor(COLORS['text_muted'])
     c.setFont('Helvetica', 10)
-    c.drawCentredString(PAGE_WIDTH / 2, y, "Bundle and early bird options available.")
+    c.drawCentredString(PAGE_WIDTH / 2, y, page['footnote'])
 
     c.showPage()
 
 
-# =============================================
-# PAGE 6: About / Back Cover
-# =============================================
-def draw_page_6(c):
-    draw_page_background(c, COLORS['bg_surface'])
+def render_about(c, page):
+    draw_page_background(c, COLORS[page['background']])
 
     y = PAGE_HEIGHT - 110
-    draw_tag(c, "About", PAGE_WIDTH / 2, y, centered=True)
+    draw_tag(c, page['tag'], PAGE_WIDTH / 2, y, centered=True)
 
     # About content
     y -= 50
 
-    about_paras = [
-        ('The gap between "knowing about AI tools" and "being AI-native" is growing.', COLORS['text_secondary']),
-        ("Tutorials teach features. Bootcamps teach syntax. Neither builds operational instincts.", COLORS['text_secondary']),
-        ("Kuma Learn built zuzu.codes to close that gap — with MBA-level rigor applied to AI-native upskilling.", COLORS['text_primary']),
-    ]
-
-    for text, color in about_paras:
-        c.setFillColor(color)
-        c.setFont('Helvetica', 12)
-        words = text.split()
-        lines = []
-        line = ""
-        max_w = CONTENT_WIDTH - 80
-        for word in words:
-            test = (line + " " + word).strip()
-            if c.stringWidth(test, 'Helvetica', 12) < max_w:
-                line = test
-            else:
-                lines.append(line)
-                line = word
-        if line:
-            lines.append(line)
-        for ln in lines:
-            c.drawCentredString(PAGE_WIDTH / 2, y, ln)
-            y -= 18
+    for para in page['paragraphs']:
+        boxes, y = layout_paragraph(para['text'], PAGE_WIDTH / 2, y, CONTENT_WIDTH - 80, 'Helvetica', 12, leading=18, centered=True)
+        draw_lines(c, boxes, 'Helvetica', 12, COLORS[para['color']])
         y -= 12
 
     # Promise box
@@ -644,21 +534,21 @@ def draw_page_6(c):
 
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Times-Italic', 13)
-    c.drawCentredString(PAGE_WIDTH / 2, y - 25, '"Complete the quadrant with genuine effort,')
-    c.drawCentredString(PAGE_WIDTH / 2, y - 43, "and you'll emerge AI-native — with instincts that")
-    c.setFillColor(COLORS['accent'])
-    c.drawCentredString(PAGE_WIDTH / 2, y - 61, 'compound across your entire career."')
+    for i, line in enumerate(page['promise']):
+        if i == len(page['promise']) - 1:
+            c.setFillColor(COLORS['accent'])
+        c.drawCentredString(PAGE_WIDTH / 2, y - 25 - 18 * i, line)
 
     # Contact
     y = y - box_height - 35
     c.setFillColor(COLORS['text_primary'])
     c.setFont('Helvetica-Bold', 11)
-    c.drawCentredString(PAGE_WIDTH / 2, y, "Contact Us")
+    c.drawCentredString(PAGE_WIDTH / 2, y, page['contact_title'])
 
     y -= 20
     c.setFillColor(COLORS['accent'])
     c.setFont('Helvetica', 12)
-    c.drawCentredString(PAGE_WIDTH / 2, y, "WhatsApp: +91 80118 58376")
+    c.drawCentredString(PAGE_WIDTH / 2, y, page['contact'])
 
     # Logo
     y -= 35
@@ -668,33 +558,192 @@ def draw_page_6(c):
     y -= 25
     c.setFillColor(COLORS['text_secondary'])
     c.setFont('Helvetica', 9)
-    c.drawCentredString(PAGE_WIDTH / 2, y, "Operated by Kuma Learn")
+    c.drawCentredString(PAGE_WIDTH / 2, y, page['entity'])
 
     # Copyright
     y -= 18
     c.setFillColor(COLORS['text_muted'])
     c.setFont('Helvetica', 9)
-    c.drawCentredString(PAGE_WIDTH / 2, y, "© 2025 Kuma Learn. All rights reserved.")
+    c.drawCentredString(PAGE_WIDTH / 2, y, page['copyright'])
 
     c.showPage()
 
 
-def create_brochure(output_path):
-    """Create the zuzu.codes brochure PDF."""
-    c = canvas.Canvas(output_path, pagesize=A4)
+TEMPLATES = {
+    'cover': render_cover,
+    'quadrants': render_quadrants,
+    'numbered_list': render_numbered_list,
+    'courses': render_courses,
+    'pricing': render_pricing,
+    'about': render_about,
+}
 
-    draw_page_1(c)
-    draw_page_2(c)
-    draw_page_3(c)
-    draw_page_4(c)
-    draw_page_5(c)
-    draw_page_6(c)
 
+# =============================================
+# BUILD
+# Pages are rendered one per PDF into a cache keyed by a hash of the page's
+# content and its template version, then spliced into the brochure.
+# =============================================
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTENT_PATH = os.path.join(SCRIPT_DIR, "brochure_content.json")
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".brochure-cache")
+
+
+def load_content(path=CONTENT_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def page_key(page):
+    """Hash of a page's content, its template's version and the shared style."""
+    template = page['template']
+    payload = json.dumps(
+        [STYLE_VERSION, USE_FORMS, template, TEMPLATE_VERSIONS[template], page],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def render_page(page, path):
+    """Render a single page to its own PDF (written atomically)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    c = canvas.Canvas(tmp, pagesize=A4, invariant=1)
+    TEMPLATES[page['template']](c, page)
     c.save()
-    print(f"PDF created: {output_path}")
+    os.replace(tmp, path)
+
+
+def render_pages(pages, cache_dir=CACHE_DIR, rebuild=False):
+    """Cached single-page PDFs for `pages`; returns (paths, number rendered)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    paths = []
+    rendered = 0
+    for page in pages:
+        path = os.path.join(cache_dir, f"{page_key(page)}.pdf")
+        if rebuild or not os.path.exists(path):
+            render_page(page, path)
+            rendered += 1
+        paths.append(path)
+    return paths, rendered
+
+
+@functools.lru_cache(maxsize=64)
+def cached_page(path):
+    """Parsed first page of a cached PDF. Cache files never change once written
+    (their names are content hashes), so a batch parses each static page once
+    per process."""
+    return PdfReader(path).pages[0]
+
+
+def splice(paths, output_path):
+    writer = PdfWriter()
+    for path in paths:
+        writer.add_page(cached_page(path))
+    with open(output_path, "wb") as f:
+        writer.write(f)
+
+
+def create_brochure(output_path, content_path=CONTENT_PATH, cache_dir=CACHE_DIR, rebuild=False):
+    """Create the zuzu.codes brochure PDF."""
+    pages = load_content(content_path)['pages']
+    paths, rendered = render_pages(pages, cache_dir, rebuild)
+    splice(paths, output_path)
+    print(f"PDF created: {output_path} ({rendered} pages rendered, {len(pages) - rendered} from cache)")
+
+
+# =============================================
+# BATCH
+# Personalized variants (recipient name, pricing, WhatsApp contact) share
+# every other page: the base pages are rendered into the cache once, then
+# workers render only the pages a variant changes and splice their own copy.
+# =============================================
+VARIANT_FIELDS = ('id', 'name', 'whatsapp', 'price')
+
+
+def load_variants(path):
+    """Variants from a CSV (one row each) or a JSON list of objects.
+
+    Fields: id (output file name), name, whatsapp, price (the featured tier),
+    and price:<Tier> for a named tier. Empty values leave the base content as is.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            variants = list(csv.DictReader(f))
+        else:
+            variants = json.load(f)
+    for number, variant in enumerate(variants, 1):
+        unknown = [k for k in variant if k not in VARIANT_FIELDS and not k.startswith("price:")]
+        if unknown:
+            raise ValueError(f"variant {number}: unknown field(s) {', '.join(unknown)}")
+    return variants
+
+
+def apply_variant(content, variant):
+    """Copy of `content` with the variant's fields filled in."""
+    content = copy.deepcopy(content)
+    for page in content['pages']:
+        template = page['template']
+        if template == 'cover' and variant.get('name'):
+            page['prepared_for'] = variant['name']
+        elif template == 'pricing':
+            for tier in page['tiers']:
+                price = variant.get(f"price:{tier['name']}") or (tier['featured'] and variant.get('price'))
+                if price:
+                    tier['price'] = price
+        elif template == 'about' and variant.get('whatsapp'):
+            page['contact'] = f"WhatsApp: {variant['whatsapp']}"
+    return content
+
+
+def variant_filename(variant, number):
+    slug = re.sub(r"[^a-z0-9]+", "-", (variant.get('id') or variant.get('name') or "").lower()).strip("-")
+    return f"brochure-{slug or number}.pdf"
+
+
+def build_variant(content, variant, output_path, cache_dir):
+    """Worker: render the variant's changed pages and splice its PDF; returns pages rendered."""
+    paths, rendered = render_pages(apply_variant(content, variant)['pages'], cache_dir)
+    splice(paths, output_path)
+    return rendered
+
+
+def create_batch(variants_path, output_dir, content_path=CONTENT_PATH, cache_dir=CACHE_DIR, workers=None):
+    """Write one brochure per variant; returns (PDFs written, seconds)."""
+    content = load_content(content_path)
+    variants = load_variants(variants_path)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = [os.path.join(output_dir, variant_filename(v, n)) for n, v in enumerate(variants, 1)]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("variants must have distinct ids or names")
+
+    start = time.perf_counter()
+    # Static pages once, up front, so no two workers race to render them
+    render_pages(content['pages'], cache_dir)
+    if workers == 1:
+        rendered = [build_variant(content, v, out, cache_dir) for v, out in zip(variants, outputs)]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(build_variant, content, v, out, cache_dir) for v, out in zip(variants, outputs)]
+            rendered = [f.result() for f in futures]
+    seconds = time.perf_counter() - start
+
+    print(f"Batch: {len(outputs)} PDFs in {seconds:.2f}s ({len(outputs) / seconds:.1f} PDFs/s, "
+          f"{workers} workers, {sum(rendered)} pages rendered) -> {output_dir}")
+    return len(outputs), seconds
 
 
 if __name__ == "__main__":
-    output_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    output_path = os.path.join(output_dir, "brochure.pdf")
-    create_brochure(output_path)
+    parser = argparse.ArgumentParser(description="Build the zuzu.codes brochure PDF.")
+    parser.add_argument("--content", default=CONTENT_PATH, help="page content (JSON)")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(SCRIPT_DIR), "brochure.pdf"))
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="re-render every page")
+    parser.add_argument("--variants", help="CSV or JSON of personalized variants; enables batch mode")
+    parser.add_argument("--output-dir", default=os.path.join(os.path.dirname(SCRIPT_DIR), "brochures"))
+    parser.add_argument("--workers", type=int, help="batch processes (default: one per core)")
+    args = parser.parse_args()
+    if args.variants:
+        create_batch(args.variants, args.output_dir, args.content, args.cache_dir, args.workers)
+    else:
+        create_brochure(args.output, args.content, args.cache_dir, args.rebuild)
@@ -0,0 +1,93 @@
+"""
+Text layout for the brochure generator.
+Word widths are measured once per (font, size) and cached; paragraphs are
+broken greedily in a single pass and returned as positioned line boxes.
+"""
+
+from dataclasses import dataclass
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+
+@dataclass(frozen=True)
+class LineBox:
+    text: str
+    x: float  # left edge, already adjusted for alignment
+    y: float  # baseline
+    width: float
+
+
+class WidthCache:
+    """Memoized string widths, one table per (font, size)."""
+
+    def __init__(self):
+        self.tables = {}
+        self.hits = 0
+        self.misses = 0
+
+    def width(self, text, font, size):
+        table = self.tables.get((font, size))
+        if table is None:
+            table = self.tables[(font, size)] = {}
+        w = table.get(text)
+        if w is None:
+            self.misses += 1
+            w = table[text] = stringWidth(text, font, size)
+        else:
+            self.hits += 1
+        return w
+
+
+# Shared across every page of a build
+widths = WidthCache()
+
+
+def text_width(text, font, size):
+    return widths.width(text, font, size)
+
+
+def break_lines(text, max_width, font, size, cache=widths):
+    """Greedy line breaking: each word is measured once (cached), each line extended in O(1).
+
+    Returns [(line_text, line_width)]. A word wider than max_width gets a line of its own.
+    Standard PDF fonts have no kerning, so a line's width is its words' widths plus spaces.
+    """
+    space = cache.width(" ", font, size)
+    lines = []
+    words = []
+    line_width = 0.0
+    for word in text.split():
+        w = cache.width(word, font, size)
+        if not words:
+            words, line_width = [word], w
+        elif line_width + space + w <= max_width:
+            words.append(word)
+            line_width += space + w
+        else:
+            lines.append((" ".join(words), line_width))
+            words, line_width = [word], w
+    if words:
+        lines.append((" ".join(words), line_width))
+    return lines
+
+
+def layout_paragraph(text, x, y, max_width, font='Helvetica', size=11, leading=None, centered=False, cache=widths):
+    """Line boxes for a paragraph starting at baseline y; returns (boxes, y below the last line).
+
+    When centered, x is the centre line, as for drawCentredString.
+    """
+    if leading is None:
+        leading = size * 1.4
+    boxes = []
+    for line_text, line_width in break_lines(text, max_width, font, size, cache):
+        left = x - line_width / 2 if centered else x
+        boxes.append(LineBox(line_text, left, y, line_width))
+        y -= leading
+    return boxes, y
+
+
+def draw_lines(c, boxes, font, size, color):
+    """Draw line boxes produced by layout_paragraph."""
+    c.setFillColor(color)
+    c.setFont(font, size)
+    for box in boxes:
+        c.drawString(box.x, box.y, box.text)
@@ -0,0 +1,502 @@
+"""Routes executor traffic across several python-executor instances.
+
+Submissions and bulk jobs go to the healthy node with the most free slots
+(from each node's /health). Returned tokens and job ids are prefixed with the
+owning node id, so polls are pinned to the node that holds the result without
+any shared state.
+
+Preambles and datasets are broadcast to every node. The router keeps a copy
+of each on disk, so a node that missed the broadcast (down at the time, or
+restarted since) is re-synced when it answers 404 for an id, and the request
+is retried there.
+
+Per-user limits (CPU ledger, in-flight cap) are enforced by each node on its
+own, so behind this router a user's effective CPU budget is the node count
+times a node's CPU_QUOTA_SECONDS + CPU_BURST_SECONDS; size them per node.
+
+Local run:
+    EXECUTOR_API_KEY=dev NODE_ID=a uvicorn main:app --app-dir ../python-executor --port 8001
+    EXECUTOR_API_KEY=dev NODE_ID=b uvicorn main:app --app-dir ../python-executor --port 8002
+    EXECUTOR_API_KEY=dev EXECUTOR_NODES="a=http://localhost:8001,b=http://localhost:8002" \\
+        uvicorn main:app --port 8000
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+import httpx
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client
+    client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS)
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    await probe_all()
+    task = asyncio.create_task(health_loop())
+    yield
+    task.cancel()
+    await client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+EXECUTOR_API_KEY = os.environ["EXECUTOR_API_KEY"]
+HEALTH_INTERVAL_SECONDS = float(os.getenv("HEALTH_INTERVAL_SECONDS", "2"))
+UNHEALTHY_AFTER_FAILURES = int(os.getenv("UNHEALTHY_AFTER_FAILURES", "2"))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "30"))
+BLOB_TTL_SECONDS = 300  # matches the executor's stdin retention
+# How long the router keeps its copy of a preamble or dataset since last use
+SHARED_TTL_SECONDS = int(os.getenv("SHARED_TTL_SECONDS", str(24 * 3600)))
+SPOOL_DIR = os.path.join(os.getenv("SPOOL_DIR") or tempfile.gettempdir(), "zuzu-router")
+SPOOL_CHUNK_BYTES = 1024 * 1024
+TOKEN_SEPARATOR = "."
+
+client: httpx.AsyncClient
+
+
+# ─── Nodes ───────────────────────────────────────────────────────────────────
+
+class Node:
+    def __init__(self, node_id: str, url: str):
+        self.id = node_id
+        self.url = url.rstrip("/")
+        self.healthy = False
+        self.drained = False  # set by an operator; no new submissions, polls still served
+        self.failures = 0
+        self.max_concurrent = 0
+        self.in_flight = 0
+        self.sent_since_probe = 0  # submissions routed here since the last /health
+        self.last_probe: float | None = None
+
+    @property
+    def accepting(self) -> bool:
+        return self.healthy and not self.drained
+
+    @property
+    def free_slots(self) -> int:
+        return self.max_concurrent - self.in_flight - self.sent_since_probe
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "healthy": self.healthy,
+            "drained": self.drained,
+            "failures": self.failures,
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "free_slots": self.free_slots,
+            "last_probe": self.last_probe,
+        }
+
+
+def parse_nodes(spec: str) -> dict[str, Node]:
+    """Parse EXECUTOR_NODES: comma-separated `id=url` pairs (bare urls get n0, n1, ...)."""
+    nodes: dict[str, Node] = {}
+    for i, entry in enumerate(e.strip() for e in spec.split(",") if e.strip()):
+        node_id, sep, url = entry.partition("=")
+        if not sep:
+            node_id, url = f"n{i}", entry
+        if TOKEN_SEPARATOR in node_id:
+            raise ValueError(f"Node id must not contain '{TOKEN_SEPARATOR}': {node_id}")
+        nodes[node_id] = Node(node_id, url)
+    if not nodes:
+        raise ValueError("EXECUTOR_NODES is empty")
+    return nodes
+
+
+nodes = parse_nodes(os.environ["EXECUTOR_NODES"])
+# stdin_id -> (node id, last_used); uploads live on one node, so submissions using them must follow
+blob_nodes: dict[str, tuple[str, float]] = {}
+# preamble or dataset id -> {path, route, content_type, last_used}; the router's copy for re-syncing nodes
+shared: dict[str, dict] = {}
+
+
+def pick_node() -> Node:
+    candidates = [n for n in nodes.values() if n.accepting]
+    if not candidates:
+        raise HTTPException(status_code=503, detail="No healthy executor nodes")
+    return max(candidates, key=lambda n: n.free_slots)
+
+
+def hash_node(key: str) -> Node:
+    """Rendezvous hashing — stable owner for keys that carry no node id."""
+    return max(nodes.values(), key=lambda n: hashlib.sha256(f"{n.id}:{key}".encode()).digest())
+
+
+def split_token(token: str) -> tuple[Node, str]:
+    node_id, sep, inner = token.partition(TOKEN_SEPARATOR)
+    if sep and node_id in nodes:
+        return nodes[node_id], inner
+    return hash_node(token), token
+
+
+# ─── Health ──────────────────────────────────────────────────────────────────
+
+async def probe(node: Node):
+    try:
+        res = await client.get(f"{node.url}/health", timeout=HEALTH_INTERVAL_SECONDS)
+        res.raise_for_status()
+        data = res.json()
+    except (httpx.HTTPError, ValueError):
+        mark_failure(node)
+        return
+    node.failures = 0
+    node.healthy = bool(data.get("ok"))
+    node.max_concurrent = int(data.get("max_concurrent", data.get("slots_available", 0)))
+    node.in_flight = int(data.get("in_flight", 0))
+    node.sent_since_probe = 0
+    node.last_probe = time.time()
+
+
+def mark_failure(node: Node):
+    node.failures += 1
+    if node.failures >= UNHEALTHY_AFTER_FAILURES:
+        node.healthy = False
+
+
+async def probe_all():
+    await asyncio.gather(*(probe(n) for n in nodes.values()))
+
+
+async def health_loop():
+    while True:
+        await asyncio.sleep(HEALTH_INTERVAL_SECONDS)
+        try:
+            await probe_all()
+            cutoff = time.time() - BLOB_TTL_SECONDS
+            for blob_id in [b for b, (_, used) in blob_nodes.items() if used < cutoff]:
+                blob_nodes.pop(blob_id, None)
+            shared_cutoff = time.time() - SHARED_TTL_SECONDS
+            for shared_id in [i for i, meta in shared.items() if meta["last_used"] < shared_cutoff]:
+                try:
+                    os.unlink(shared.pop(shared_id)["path"])
+                except FileNotFoundError:
+                    pass
+        except Exception:
+            pass  # never let a probe crash stop the loop
+
+
+# ─── Auth ────────────────────────────────────────────────────────────────────
+
+def check_auth(x_api_key: str | None):
+    if x_api_key != EXECUTOR_API_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+def forward_headers(request: Request) -> dict[str, str]:
+    keep = ("content-type", "x-api-key", "x-user-id")
+    return {k: v for k, v in request.headers.items() if k.lower() in keep}
+
+
+def relay(res: httpx.Response) -> Response:
+    return Response(content=res.content, status_code=res.status_code, media_type=res.headers.get("content-type"))
+
+
+# ─── Routes ──────────────────────────────────────────────────────────────────
+
+@app.post("/submissions")
+async def submit(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    body = await request.body()
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None  # let the node report the malformed body
+    stdin_id = payload.get("stdin_id") if isinstance(payload, dict) else None
+
+    if stdin_id in blob_nodes:
+        owner, _ = blob_nodes[stdin_id]
+        blob_nodes[stdin_id] = (owner, time.time())
+        targets = [nodes[owner]]
+    else:
+        targets = sorted((n for n in nodes.values() if n.accepting), key=lambda n: -n.free_slots)
+        if not targets:
+            raise HTTPException(status_code=503, detail="No healthy executor nodes")
+
+    for node in targets:
+        try:
+            res = await post_with_resync(node, "/submissions", body, payload, request)
+        except httpx.HTTPError:
+            mark_failure(node)
+            continue
+        if res.status_code != 200:
+            return relay(res)
+        node.sent_since_probe += 1
+        token = res.json()["token"]
+        return {"token": f"{node.id}{TOKEN_SEPARATOR}{token}"}
+
+    raise HTTPException(status_code=502, detail="All executor nodes failed")
+
+
+@app.get("/submissions/{token}")
+async def get_submission(
+    token: str,
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    node, inner = split_token(token)
+    try:
+        res = await client.get(f"{node.url}/submissions/{inner}", headers=forward_headers(request))
+    except httpx.HTTPError:
+        mark_failure(node)
+        raise HTTPException(status_code=502, detail=f"Executor node {node.id} unreachable")
+    return relay(res)
+
+
+@app.post("/stdin")
+async def upload_stdin(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    node = pick_node()
+    try:
+        res = await client.post(f"{node.url}/stdin", content=request.stream(), headers=forward_headers(request))
+    except httpx.HTTPError:
+        mark_failure(node)
+        raise HTTPException(status_code=502, detail=f"Executor node {node.id} unreachable")
+    if res.status_code == 200:
+        blob_nodes[res.json()["stdin_id"]] = (node.id, time.time())
+    return relay(res)
+
+
+async def spool(request: Request) -> str:
+    """Stream the request body to a temp file under SPOOL_DIR; returns its path."""
+    fd, path = tempfile.mkstemp(dir=SPOOL_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in request.stream():
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+async def file_chunks(path: str):
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, SPOOL_CHUNK_BYTES):
+            yield chunk
+
+
+async def push(node: Node, route: str, path: str, content_type: str | None) -> httpx.Response:
+    headers = {"x-api-key": EXECUTOR_API_KEY}
+    if content_type:
+        headers["content-type"] = content_type
+    return await client.post(f"{node.url}{route}", content=file_chunks(path), headers=headers)
+
+
+async def broadcast(request: Request, route: str, id_field: str) -> Response:
+    """Send the same body to every healthy node; ids are content hashes, so they agree across nodes.
+
+    The body is spooled to disk rather than held in memory, and kept under its
+    id so nodes that were not reached can be re-synced later.
+    """
+    targets = [n for n in nodes.values() if n.healthy]
+    if not targets:
+        raise HTTPException(status_code=503, detail="No healthy executor nodes")
+    path = await spool(request)
+    content_type = request.headers.get("content-type")
+    try:
+        responses = await asyncio.gather(
+            *(push(n, route, path, content_type) for n in targets), return_exceptions=True
+        )
+        for node, res in zip(targets, responses):
+            if isinstance(res, httpx.HTTPError):
+                mark_failure(node)
+        ok = [r for r in responses if isinstance(r, httpx.Response)]
+        if not ok:
+            raise HTTPException(status_code=502, detail="All executor nodes failed")
+        accepted = next((r for r in ok if r.status_code == 200), None)
+        if accepted is not None:
+            shared_id = accepted.json()[id_field]
+            kept = os.path.join(SPOOL_DIR, shared_id)
+            os.replace(path, kept)
+            path = None
+            shared[shared_id] = {"path": kept, "route": route, "content_type": content_type, "last_used": time.time()}
+        return relay(next((r for r in ok if r.status_code != 200), ok[0]))
+    finally:
+        if path is not None:
+            os.unlink(path)
+
+
+def shared_ids(payload) -> list[str]:
+    """Preamble and dataset ids a submission or job body refers to that the router holds copies of."""
+    if not isinstance(payload, dict):
+        return []
+    refs = []
+    for item in [payload, *(payload.get("problems") or [])]:
+        if isinstance(item, dict):
+            refs.append(item.get("preamble_id"))
+            if isinstance(item.get("datasets"), dict):
+                refs.extend(item["datasets"].values())
+    return [r for r in dict.fromkeys(refs) if isinstance(r, str) and r in shared]
+
+
+async def resync(node: Node, ids: list[str]) -> bool:
+    """Re-upload preambles/datasets to a node that lost them. True if all were accepted."""
+    for shared_id in ids:
+        meta = shared[shared_id]
+        meta["last_used"] = time.time()
+        try:
+            res = await push(node, meta["route"], meta["path"], meta["content_type"])
+        except (httpx.HTTPError, OSError):
+            return False
+        if res.status_code != 200:
+            return False
+    return True
+
+
+async def post_with_resync(node: Node, route: str, body: bytes, payload, request: Request) -> httpx.Response:
+    """POST to a node; on 404 for a shared id the node lacks, re-sync it and retry once."""
+    res = await client.post(f"{node.url}{route}", content=body, headers=forward_headers(request))
+    ids = shared_ids(payload)
+    for shared_id in ids:
+        shared[shared_id]["last_used"] = time.time()
+    if res.status_code == 404 and ids and await resync(node, ids):
+        res = await client.post(f"{node.url}{route}", content=body, headers=forward_headers(request))
+    return res
+
+
+@app.post("/preambles")
+async def register_preamble(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    return await broadcast(request, "/preambles", "preamble_id")
+
+
+@app.post("/datasets")
+async def upload_dataset(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    return await broadcast(request, "/datasets", "dataset_id")
+
+
+@app.post("/jobs")
+async def create_job(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    body = await request.body()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None  # let the node report the malformed body
+    node = pick_node()
+    try:
+        res = await post_with_resync(node, "/jobs", body, payload, request)
+    except httpx.HTTPError:
+        mark_failure(node)
+        raise HTTPException(status_code=502, detail=f"Executor node {node.id} unreachable")
+    if res.status_code != 200:
+        return relay(res)
+    data = res.json()
+    data["job_id"] = f"{node.id}{TOKEN_SEPARATOR}{data['job_id']}"
+    return data
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    node, inner = split_token(job_id)
+    try:
+        res = await client.get(f"{node.url}/jobs/{inner}", headers=forward_headers(request))
+    except httpx.HTTPError:
+        mark_failure(node)
+        raise HTTPException(status_code=502, detail=f"Executor node {node.id} unreachable")
+    if res.status_code != 200:
+        return relay(res)
+    data = res.json()
+    data["job_id"] = job_id
+    return data
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    """Relay the owning node's NDJSON event stream line by line as it arrives."""
+    check_auth(x_api_key)
+    node, inner = split_token(job_id)
+    # Events can be minutes apart, so no read timeout; the stream ends with the job's `done` event
+    upstream = client.build_request(
+        "GET",
+        f"{node.url}/jobs/{inner}/events",
+        headers=forward_headers(request),
+        timeout=httpx.Timeout(REQUEST_TIMEOUT_SECONDS, read=None),
+    )
+    try:
+        res = await client.send(upstream, stream=True)
+    except httpx.HTTPError:
+        mark_failure(node)
+        raise HTTPException(status_code=502, detail=f"Executor node {node.id} unreachable")
+    if res.status_code != 200:
+        await res.aread()
+        await res.aclose()
+        return relay(res)
+
+    async def events():
+        try:
+            async for line in res.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if "job_id" in event:
+                    event["job_id"] = job_id  # the node-prefixed id, as GET /jobs/{id} returns
+                yield json.dumps(event) + "\n"
+        finally:
+            await res.aclose()
+
+    return StreamingResponse(events(), media_type=res.headers.get("content-type"))
+
+
+@app.post("/nodes/{node_id}/drain")
+async def drain(node_id: str, x_api_key: str | None = Header(default=None)):
+    check_auth(x_api_key)
+    node = nodes.get(node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    node.drained = True
+    return node.to_dict()
+
+
+@app.post("/nodes/{node_id}/undrain")
+async def undrain(node_id: str, x_api_key: str | None = Header(default=None)):
+    check_auth(x_api_key)
+    node = nodes.get(node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    node.drained = False
+    return node.to_dict()
+
+
+@app.get("/health")
+async def health():
+    accepting = [n for n in nodes.values() if n.accepting]
+    return {
+        "ok": bool(accepting),
+        "slots_available": sum(max(0, n.free_slots) for n in accepting),
+        "nodes": [n.to_dict() for n in nodes.values()],
+    }
@@ -0,0 +1,295 @@
+"""Noisy-neighbor isolation: latency of normal runs while a pathological one holds a slot.
+
+    python bench_noisy_neighbor.py [--seconds 10] [--rate 8] [--max-ratio 3]
+                                   [--max-server-rss-mb 256] [--max-tree-rss-mb 1024]
+
+Starts a local executor, measures a baseline of steady small submissions, then
+repeats the measurement with each adversarial program kept running in one slot.
+Reports end-to-end p50/p99 latency and peak resources of the executor's process
+tree (server RSS, tree PSS, process count), and exits 1 if any scenario pushes
+p99 above `max(baseline * max-ratio, baseline + slack)` or the node past its
+resource caps. Pass --url to target a running executor instead (resource peaks
+are skipped).
+
+The p99 gate assumes a spare core per slot plus one for the server
+(--max-concurrent 4 -> 5 cores). With fewer, the CPU-bound adversaries share a
+core with the normal runs and the gate fails by design. Reference run, defaults,
+1 core:
+
+    scenario          runs   p50 ms   p99 ms  server MB  tree MB  procs  adversary
+    baseline            80     93.5    121.8       47.8     45.0      2  -
+    infinite-print      77    247.1    399.7       59.0     66.0      5  [8]
+    memory-balloon      75    380.5    570.7       54.9    540.0      5  [11]
+    fork-loop           79    103.3    279.2       55.0     85.7     36  [5]
+    busy-spin           78    234.6    402.4       52.6     65.4      5  [5]
+
+The memory caps and cleanup hold here: the balloon dies with MemoryError at
+INTERPRETER_MEMORY_MB + memory_limit_mb and no process outlives its run. Only
+the p99 gate fails.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+API_KEY = os.getenv("EXECUTOR_API_KEY", "bench")
+HEADERS = {"X-API-Key": API_KEY}
+POLL_INTERVAL = 0.01
+
+NORMAL = "n = int(input())\nprint(sum(i * i for i in range(n)))"
+NORMAL_STDIN = "20000"
+
+ADVERSARIES = {
+    "infinite-print": 'while True:\n    print("x" * 1024)',
+    "memory-balloon": (
+        "blocks = []\n"
+        "while True:\n"
+        "    blocks.append(bytearray(16 * 1024 * 1024))  # touched, until the run's memory cap stops it"
+    ),
+    "fork-loop": (
+        "import os, time\n"
+        "for _ in range(32):\n"
+        "    if os.fork() == 0:\n"
+        "        time.sleep(60)\n"
+        "        os._exit(0)\n"
+        "time.sleep(60)"
+    ),
+    "busy-spin": "while True:\n    pass",
+}
+
+
+# ─── Executor ────────────────────────────────────────────────────────────────
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_executor(port: int, max_concurrent: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "EXECUTOR_API_KEY": API_KEY,
+        "MAX_CONCURRENT": str(max_concurrent),
+        "CPU_QUOTA_SECONDS": "1000000",  # the adversary resubmits for the whole run
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient):
+    for _ in range(100):
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("executor did not start")
+
+
+# ─── Node resources ──────────────────────────────────────────────────────────
+
+def process_tree(root: int) -> list[int]:
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+def pss_bytes(pid: int) -> int:
+    """Proportional RSS: pages shared with forks are split between them, not counted per process."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class Peaks:
+    """Samples the executor's process tree until stopped."""
+
+    def __init__(self, root: int | None):
+        self.root = root
+        self.server_rss = 0
+        self.tree_rss = 0
+        self.processes = 0
+
+    async def sample(self, stop: asyncio.Event):
+        while self.root is not None and not stop.is_set():
+            tree = process_tree(self.root)
+            self.server_rss = max(self.server_rss, rss_bytes(self.root))
+            self.tree_rss = max(self.tree_rss, sum(pss_bytes(p) for p in tree))
+            self.processes = max(self.processes, len(tree))
+            await asyncio.sleep(0.05)
+
+    def leftover(self) -> int:
+        """Processes still in the tree besides the server itself."""
+        return len(process_tree(self.root)) - 1 if self.root is not None else 0
+
+
+# ─── Load ────────────────────────────────────────────────────────────────────
+
+async def run_once(client: httpx.AsyncClient, body: dict, user_id: str) -> tuple[float, int]:
+    start = time.monotonic()
+    res = await client.post("/submissions", json=body, headers={**HEADERS, "X-User-Id": user_id})
+    res.raise_for_status()
+    token = res.json()["token"]
+    while True:
+        data = (await client.get(f"/submissions/{token}", headers=HEADERS)).json()
+        if data["status"]["id"] >= 3:
+            return time.monotonic() - start, data["status"]["id"]
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def steady(client: httpx.AsyncClient, seconds: float, rate: float) -> list[float]:
+    """Submit NORMAL at a fixed rate from distinct users; return each run's latency."""
+    body = {"source_code": NORMAL, "stdin": NORMAL_STDIN}
+    tasks = []
+    deadline = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < deadline:
+        tasks.append(asyncio.create_task(run_once(client, body, f"normal-{i % 64}")))
+        i += 1
+        await asyncio.sleep(1 / rate)
+    outcomes = await asyncio.gather(*tasks)
+    bad = [s for _, s in outcomes if s != 3]
+    if bad:
+        raise RuntimeError(f"{len(bad)} normal runs did not succeed: {sorted(set(bad))}")
+    return [latency for latency, _ in outcomes]
+
+
+async def adversary(client: httpx.AsyncClient, code: str, stop: asyncio.Event, statuses: list[int]):
+    """Keep one copy of `code` running until stopped."""
+    body = {"source_code": code, "cpu_time_limit": 5}
+    while not stop.is_set():
+        _, status = await run_once(client, body, "adversary")
+        statuses.append(status)
+
+
+def p(latencies: list[float], q: float) -> float:
+    return statistics.quantiles(latencies, n=100, method="inclusive")[q - 1] * 1000
+
+
+async def scenario(client, name, code, args, root) -> dict:
+    stop = asyncio.Event()
+    peaks = Peaks(root)
+    sampler = asyncio.create_task(peaks.sample(stop))
+    statuses: list[int] = []
+    attacker = asyncio.create_task(adversary(client, code, stop, statuses)) if code else None
+    if attacker is not None:
+        await asyncio.sleep(0.5)  # let it get going before measuring
+    latencies = await steady(client, args.seconds, args.rate)
+    stop.set()
+    if attacker is not None:
+        await attacker
+    await sampler
+    await asyncio.sleep(0.2)
+    return {
+        "name": name,
+        "runs": len(latencies),
+        "p50": p(latencies, 50),
+        "p99": p(latencies, 99),
+        "server_rss": peaks.server_rss,
+        "tree_rss": peaks.tree_rss,
+        "processes": peaks.processes,
+        "leftover": peaks.leftover(),
+        "adversary_statuses": sorted(set(statuses)),
+    }
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+
+async def main_async(args) -> int:
+    proc = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        proc = start_executor(port, args.max_concurrent)
+        url = f"http://127.0.0.1:{port}"
+    root = proc.pid if proc is not None else None
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            await wait_ready(client)
+            await steady(client, 1, args.rate)  # warm-up
+            rows = [await scenario(client, "baseline", None, args, root)]
+            for name, code in ADVERSARIES.items():
+                rows.append(await scenario(client, name, code, args, root))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    mb = 1024 * 1024
+    baseline = rows[0]["p99"]
+    p99_limit = max(baseline * args.max_ratio, baseline + args.slack_ms)
+    print(f"{os.cpu_count()} cores, {args.max_concurrent} slots, p99 limit {p99_limit:.1f} ms")
+    print(f"{'scenario':<16}{'runs':>6}{'p50 ms':>9}{'p99 ms':>9}{'server MB':>11}{'tree MB':>9}{'procs':>7}  adversary")
+    failures = []
+    for row in rows:
+        print(
+            f"{row['name']:<16}{row['runs']:>6}{row['p50']:>9.1f}{row['p99']:>9.1f}"
+            f"{row['server_rss'] / mb:>11.1f}{row['tree_rss'] / mb:>9.1f}{row['processes']:>7}"
+            f"  {row['adversary_statuses'] or '-'}"
+        )
+        if row["p99"] > p99_limit:
+            failures.append(f"{row['name']}: p99 {row['p99']:.1f} ms > {p99_limit:.1f} ms")
+        if root is not None and row["server_rss"] > args.max_server_rss_mb * mb:
+            failures.append(f"{row['name']}: executor RSS {row['server_rss'] / mb:.0f} MB > {args.max_server_rss_mb} MB")
+        if root is not None and row["tree_rss"] > args.max_tree_rss_mb * mb:
+            failures.append(f"{row['name']}: process tree RSS {row['tree_rss'] / mb:.0f} MB > {args.max_tree_rss_mb} MB")
+        if root is not None and row["leftover"] > 0:
+            failures.append(f"{row['name']}: {row['leftover']} processes outlived their run")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="existing executor (default: start one locally)")
+    parser.add_argument("--seconds", type=float, default=10, help="measurement window per scenario")
+    parser.add_argument("--rate", type=float, default=8, help="normal submissions per second")
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    parser.add_argument("--max-ratio", type=float, default=3.0, help="allowed p99 growth over baseline")
+    parser.add_argument("--slack-ms", type=float, default=250, help="allowed absolute p99 growth")
+    parser.add_argument("--max-server-rss-mb", type=float, default=256, help="executor process RSS cap")
+    parser.add_argument("--max-tree-rss-mb", type=float, default=1024, help="executor plus its runs, RSS cap")
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
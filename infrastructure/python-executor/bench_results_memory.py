@@ -0,0 +1,89 @@
+"""Bytes per stored result: plain result dicts vs ResultRecord.
+
+    python bench_results_memory.py [count]
+
+Builds `count` stored results for a few typical output shapes both ways and
+reports the traced allocation per result.
+"""
+
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("EXECUTOR_API_KEY", "bench")
+from main import ResultRecord  # noqa: E402
+
+TRACEBACK = (
+    "Traceback (most recent call last):\n"
+    '  File "<string>", line 7, in <module>\n'
+    '  File "<string>", line 4, in solve\n'
+    "TypeError: unsupported operand type(s) for +: 'int' and 'str'\n"
+)
+rng = random.Random(0)
+SHAPES = {
+    "short print": ("[1,2,3]\n", None),
+    "traceback": (None, TRACEBACK),
+    "20 KB log": ("".join(f"step {i}: ok\n" for i in range(1600)), None),
+    "20 KB noise": ("".join(rng.choices(string.printable, k=20_000)), None),
+}
+
+
+def runner_result(stdout: str | None, stderr: str | None) -> dict:
+    return {
+        "status": {"id": 3, "description": "Accepted"},
+        "stdout": stdout,
+        "stderr": stderr,
+        "time": "0.042",
+        "memory": None,
+    }
+
+
+def fresh(text: str | None) -> str | None:
+    """A new string object, as each run decodes its own output."""
+    return text.encode().decode() if text is not None else None
+
+
+def as_dict(stdout: str | None, stderr: str | None) -> dict:
+    """The previous storage: the runner's dict merged into the queued entry."""
+    entry = {
+        "status": {"id": 1, "description": "In Queue"},
+        "stdout": None,
+        "stderr": None,
+        "time": None,
+        "memory": None,
+        "created_at": time.time(),
+    }
+    entry.update(runner_result(fresh(stdout), fresh(stderr)))
+    return entry
+
+
+def as_record(stdout: str | None, stderr: str | None) -> ResultRecord:
+    record = ResultRecord(int(time.time()))
+    record.fill(runner_result(fresh(stdout), fresh(stderr)))
+    return record
+
+
+def measure(build, count: int) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = [build() for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'shape':<14}{'dict B':>10}{'record B':>10}{'ratio':>8}")
+    for name, (stdout, stderr) in SHAPES.items():
+        old = measure(lambda: as_dict(stdout, stderr), count)
+        new = measure(lambda: as_record(stdout, stderr), count)
+        print(f"{name:<14}{old:>10.0f}{new:>10.0f}{old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
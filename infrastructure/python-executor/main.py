@@ -1,30 +1,136 @@
 import asyncio
+import fcntl
+import hashlib
+import json
+import math
 import os
+import re
+import resource
+import shutil
+import signal
+import socket
+import struct
+import subprocess
+import tempfile
+import threading
 import time
 import uuid
-from collections import defaultdict
+import zlib
+from collections import OrderedDict, defaultdict, deque
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Header, HTTPException
+from enum import IntEnum
+from typing import BinaryIO
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    for directory in (STDIN_DIR, RUN_DIR):
+        os.makedirs(directory, exist_ok=True)
     asyncio.create_task(cleanup_loop())
     yield
+    for zygote in zygotes.values():
+        zygote.close()
 
 app = FastAPI(lifespan=lifespan)
 
 EXECUTOR_API_KEY = os.environ["EXECUTOR_API_KEY"]
+NODE_ID = os.getenv("NODE_ID", "")  # reported in /health so a router can tell instances apart
 MAX_CONCURRENT = int(os.getenv("MAX_CONCURRENT", "4"))
-MAX_QUEUE_PER_USER = int(os.getenv("MAX_QUEUE_PER_USER", "2"))
+CPU_QUOTA_SECONDS = float(os.getenv("CPU_QUOTA_SECONDS", "60"))  # execution seconds per user per window
+CPU_QUOTA_WINDOW_SECONDS = float(os.getenv("CPU_QUOTA_WINDOW_SECONDS", "300"))
+CPU_BURST_SECONDS = float(os.getenv("CPU_BURST_SECONDS", "30"))  # headroom above the quota before throttling
+DEFAULT_CPU_TIME_LIMIT = 10.0
+# In-flight backstop. Each admitted run also reserves its full time limit in the
+# CPU ledger until it settles, so a user can have at most (quota + burst) / limit
+# runs in flight; the default matches that for runs at the default limit. It
+# only binds on its own for runs with shorter limits.
+MAX_QUEUE_PER_USER = int(os.getenv(
+    "MAX_QUEUE_PER_USER", str(math.ceil((CPU_QUOTA_SECONDS + CPU_BURST_SECONDS) / DEFAULT_CPU_TIME_LIMIT))
+))
 RESULT_TTL_SECONDS = 300  # clean up results older than 5 minutes
+MAX_STDIN_BYTES = int(os.getenv("MAX_STDIN_BYTES", str(64 * 1024 * 1024)))
+# Uploaded stdin is spooled to tmpfs when available so children read it straight from page cache
+SPOOL_ROOT = os.getenv("SPOOL_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+STDIN_DIR = os.path.join(SPOOL_ROOT, "zuzu-stdin")
+RUN_DIR = os.path.join(SPOOL_ROOT, "zuzu-runs")  # per-run working dirs linking in datasets
+MAX_DATASET_BYTES = int(os.getenv("MAX_DATASET_BYTES", str(256 * 1024 * 1024)))
+DATASET_TTL_SECONDS = int(os.getenv("DATASET_TTL_SECONDS", str(24 * 3600)))  # since last use
+DATASET_NAME_RE = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+MAX_WARM_PREAMBLES = int(os.getenv("MAX_WARM_PREAMBLES", "8"))  # zygote processes kept alive
+PREAMBLE_TIME_LIMIT = float(os.getenv("PREAMBLE_TIME_LIMIT", "10"))
+CASE_MEMORY_LIMIT_MB = int(os.getenv("CASE_MEMORY_LIMIT_MB", "256"))
+# Address space a plain run may map before its own memory_limit_mb starts counting:
+# the interpreter plus typical imports. Preamble runs measure theirs after the fork.
+INTERPRETER_MEMORY_MB = int(os.getenv("INTERPRETER_MEMORY_MB", "256"))
+CASE_GRACE_SECONDS = 0.5  # a case is SIGKILLed this long after its time limit if its own timers failed
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "1000"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")  # optional JSON-lines file of completed traces
+MAX_OUTPUT_BYTES = int(os.getenv("MAX_OUTPUT_BYTES", str(1024 * 1024)))  # per stream; the run is killed past it
+OUTPUT_COMPRESS_THRESHOLD = 1024  # stored outputs at least this many bytes are zlib-compressed
+ENTRY_POINT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Slots bulk jobs may never take, so interactive runs always find one soon
+BULK_RESERVED_SLOTS = int(os.getenv("BULK_RESERVED_SLOTS", "1"))
+MAX_ACTIVE_JOBS = int(os.getenv("MAX_ACTIVE_JOBS", "2"))
 
-semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-# token -> { status_id, description, stdout, stderr, time, created_at }
-results: dict[str, dict] = {}
+
+class SlotPool:
+    """Execution slots. A freed slot goes to waiting interactive runs before bulk ones."""
+
+    def __init__(self, size: int):
+        self.available = size
+        self._waiters: dict[bool, deque[asyncio.Future]] = {False: deque(), True: deque()}
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for q in self._waiters.values() for f in q if not f.done())
+
+    async def acquire(self, bulk: bool = False):
+        if self.available > 0:
+            self.available -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[bulk].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # handed a slot just as we were cancelled
+            raise
+
+    def release(self):
+        for bulk in (False, True):
+            queue = self._waiters[bulk]
+            while queue:
+                fut = queue.popleft()
+                if not fut.done():
+                    fut.set_result(None)
+                    return
+        self.available += 1
+
+    @asynccontextmanager
+    async def slot(self, bulk: bool = False):
+        await self.acquire(bulk)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+semaphore = SlotPool(MAX_CONCURRENT)
+bulk_slots = asyncio.Semaphore(max(1, MAX_CONCURRENT - BULK_RESERVED_SLOTS))
+# token -> compact record; see ResultRecord
+results: dict[str, "ResultRecord"] = {}
 # user_id -> number of submissions currently queued or running
 user_depth: dict[str, int] = defaultdict(int)
+# stdin_id -> { path, size, last_used }
+stdin_blobs: dict[str, dict] = {}
+# dataset_id -> { fd, size, last_used }; fd is a sealed memfd owned by this process
+datasets: dict[str, dict] = {}
+# preamble_id -> source
+preambles: dict[str, str] = {}
 
 
 # ─── Auth ────────────────────────────────────────────────────────────────────
@@ -34,87 +140,1149 @@ def check_auth(x_api_key: str | None):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
+# ─── Quota ───────────────────────────────────────────────────────────────────
+#
+# Sliding-window ledger of execution seconds per user. Admitting a
+# submission reserves its time limit; when the run finishes the reservation
+# is settled to the measured time. A user may commit up to quota + burst
+# (used plus reserved) within the window; once that is hit they are
+# throttled until it decays back under the plain quota.
+#
+# The ledger is per process. Behind the executor router each node keeps its
+# own, so a user's effective budget is the node count times these settings;
+# size CPU_QUOTA_SECONDS / CPU_BURST_SECONDS per node accordingly.
+
+class CpuLedger:
+    def __init__(self, quota: float, burst: float, window: float):
+        self.quota = quota
+        self.burst = burst
+        self.window = window
+        # user_id -> (monotonic time, seconds) charges, oldest first
+        self.charges: dict[str, deque[tuple[float, float]]] = defaultdict(deque)
+        # user_id -> time limits of admitted runs not yet settled
+        self.reservations: dict[str, list[float]] = defaultdict(list)
+        self.throttled: set[str] = set()
+
+    def _prune(self, user_id: str, now: float):
+        charges = self.charges.get(user_id)
+        if charges is None:
+            return
+        while charges and charges[0][0] <= now - self.window:
+            charges.popleft()
+        if not charges:
+            del self.charges[user_id]
+
+    def used(self, user_id: str) -> float:
+        self._prune(user_id, time.monotonic())
+        return sum(seconds for _, seconds in self.charges.get(user_id, ()))
+
+    def reserved(self, user_id: str) -> float:
+        return sum(self.reservations.get(user_id, ()))
+
+    def charge(self, user_id: str, seconds: float):
+        if seconds > 0:
+            self.charges[user_id].append((time.monotonic(), seconds))
+
+    def reserve(self, user_id: str, seconds: float):
+        self.reservations[user_id].append(seconds)
+
+    def settle(self, user_id: str, reserved: float, seconds: float | None):
+        """Release a reservation and charge what the run actually used."""
+        pending = self.reservations.get(user_id)
+        if pending is not None:
+            pending.remove(reserved)
+            if not pending:
+                del self.reservations[user_id]
+        if seconds is not None:
+            self.charge(user_id, seconds)
+
+    def retry_after(self, user_id: str) -> float | None:
+        """None if the user may submit now, else seconds until they may."""
+        committed = self.used(user_id) + self.reserved(user_id)
+        if user_id in self.throttled and committed < self.quota:
+            self.throttled.discard(user_id)
+        if committed >= self.quota + self.burst:
+            self.throttled.add(user_id)
+        if user_id not in self.throttled:
+            return None
+        # Wait for enough of the oldest charges to leave the window
+        now = time.monotonic()
+        for at, seconds in self.charges.get(user_id, ()):
+            committed -= seconds
+            if committed < self.quota:
+                return max(0.0, at + self.window - now)
+        # Over on in-flight reservations alone: the shortest settles within its limit
+        return min(self.reservations.get(user_id) or [0.0])
+
+    def sweep(self):
+        now = time.monotonic()
+        for user_id in list(self.charges):
+            self._prune(user_id, now)
+        self.throttled &= set(self.charges) | set(self.reservations)
+
+    def usage(self, user_id: str) -> dict:
+        retry_after = self.retry_after(user_id)
+        used = self.used(user_id)
+        reserved = self.reserved(user_id)
+        return {
+            "used_seconds": round(used, 3),
+            "reserved_seconds": round(reserved, 3),
+            "quota_seconds": self.quota,
+            "burst_seconds": self.burst,
+            "window_seconds": self.window,
+            "remaining_seconds": round(max(0.0, self.quota + self.burst - used - reserved), 3),
+            "throttled": retry_after is not None,
+            "retry_after": round(retry_after, 1) if retry_after is not None else None,
+        }
+
+
+cpu_ledger = CpuLedger(CPU_QUOTA_SECONDS, CPU_BURST_SECONDS, CPU_QUOTA_WINDOW_SECONDS)
+
+
 # ─── Models ──────────────────────────────────────────────────────────────────
 
+class PreambleRequest(BaseModel):
+    source_code: str
+
+
 class SubmissionRequest(BaseModel):
     source_code: str
     language_id: int = 71  # ignored — always Python 3
     stdin: str = ""
-    cpu_time_limit: float = 10.0
+    stdin_id: str | None = None  # from POST /stdin — takes the place of inline stdin
+    preamble_id: str | None = None  # from POST /preambles — runs on top of its warm state
+    cpu_time_limit: float = DEFAULT_CPU_TIME_LIMIT
+    # Isolated test-case mode: run source_code once, then call entry_point(*args)
+    # in a separate fork per case. cpu_time_limit then applies per case.
+    entry_point: str | None = None
+    test_cases: list[list] | None = None  # positional args for each case
+    # Per case on top of the post-setup footprint; otherwise per run (see INTERPRETER_MEMORY_MB)
+    memory_limit_mb: int = CASE_MEMORY_LIMIT_MB
+    # file name -> dataset_id from POST /datasets; each appears read-only in the run's working dir
+    datasets: dict[str, str] | None = None
+
+
+class JobTestCase(BaseModel):
+    description: str = ""
+    args: list
+
+
+class JobProblem(BaseModel):
+    id: str
+    solution_code: str
+    entry_point: str
+    test_cases: list[JobTestCase]
+    preamble_id: str | None = None
+    datasets: dict[str, str] | None = None
+
+
+class JobRequest(BaseModel):
+    problems: list[JobProblem]
+    cpu_time_limit: float = DEFAULT_CPU_TIME_LIMIT  # per test case
+
+
+# ─── Tracing ─────────────────────────────────────────────────────────────────
+
+class Trace:
+    """Timestamped lifecycle spans for one submission, in ms since it was received."""
+
+    def __init__(self, token: str, user_id: str):
+        self.token = token
+        self.user_id = user_id
+        self.received_at = time.time()
+        self._t0 = time.monotonic()
+        self.spans: dict[str, float] = {"received": 0.0}
+
+    def mark(self, span: str):
+        """Record a span once; later marks of the same span are ignored."""
+        if span not in self.spans:
+            self.spans[span] = round((time.monotonic() - self._t0) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            "token": self.token,
+            "user_id": self.user_id,
+            "received_at": self.received_at,
+            "spans": self.spans,
+        }
+
+
+# Most recent traces, oldest dropped first
+traces: deque[Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+# token -> trace, until the finished result is first fetched or expires unfetched
+open_traces: dict[str, Trace] = {}
+
+
+def write_traces(batch: list[Trace]):
+    """Append traces to TRACE_EXPORT_PATH. Blocking; call via asyncio.to_thread."""
+    try:
+        with open(TRACE_EXPORT_PATH, "a") as f:
+            f.write("".join(json.dumps(t.to_dict()) + "\n" for t in batch))
+    except OSError:
+        pass  # tracing must never fail a request
+
+
+async def export_traces(batch: list[Trace]):
+    if TRACE_EXPORT_PATH and batch:
+        await asyncio.to_thread(write_traces, batch)
+
+
+# ─── Results ─────────────────────────────────────────────────────────────────
+#
+# Runners return plain Judge0-shaped dicts; what is kept in `results` for the
+# TTL is a ResultRecord: slotted, status as a shared enum member, outputs as
+# (possibly compressed) bytes. The JSON shape is rebuilt only on GET.
+
+class Status(IntEnum):
+    IN_QUEUE = 1
+    PROCESSING = 2
+    ACCEPTED = 3
+    TIME_LIMIT_EXCEEDED = 5
+    OUTPUT_LIMIT_EXCEEDED = 8
+    RUNTIME_ERROR = 11
+    INTERNAL_ERROR = 13
+
+
+STATUS_DESCRIPTIONS = {
+    Status.IN_QUEUE: "In Queue",
+    Status.PROCESSING: "Processing",
+    Status.ACCEPTED: "Accepted",
+    Status.TIME_LIMIT_EXCEEDED: "Time Limit Exceeded",
+    Status.OUTPUT_LIMIT_EXCEEDED: "Runtime Error (SIGXFSZ)",
+    Status.RUNTIME_ERROR: "Runtime Error (NZEC)",
+    Status.INTERNAL_ERROR: "Internal Error",
+}
+# One shared dict per status for responses instead of a fresh one per result
+STATUS_JSON = {s: {"id": int(s), "description": d} for s, d in STATUS_DESCRIPTIONS.items()}
+
+_RAW, _ZLIB = b"r", b"z"
+
+
+def pack_output(text: str | None) -> bytes | None:
+    """Encode an output for storage, compressing it when that pays off. The first byte tags the format."""
+    if text is None:
+        return None
+    data = text.encode()
+    if len(data) >= OUTPUT_COMPRESS_THRESHOLD:
+        packed = zlib.compress(data, 1)
+        if len(packed) < len(data):
+            return _ZLIB + packed
+    return _RAW + data
+
+
+def unpack_output(packed: bytes | None) -> str | None:
+    if packed is None:
+        return None
+    body = memoryview(packed)[1:]
+    if packed[:1] == _ZLIB:
+        return zlib.decompress(body).decode(errors="replace")
+    return str(body, "utf-8", "replace")
+
+
+class ResultRecord:
+    __slots__ = ("status", "stdout", "stderr", "time", "memory", "created_at", "tests")
+
+    def __init__(self, created_at: int = 0):
+        self.status = Status.IN_QUEUE
+        self.stdout: bytes | None = None
+        self.stderr: bytes | None = None
+        self.time: float | None = None
+        self.memory: int | None = None
+        self.created_at = created_at  # whole seconds; only used for the TTL sweep
+        self.tests: tuple[ResultRecord, ...] | None = None
+
+    def fill(self, result: dict):
+        """Take over a runner's result dict."""
+        self.status = Status(result["status"]["id"])
+        self.stdout = pack_output(result["stdout"])
+        self.stderr = pack_output(result["stderr"])
+        self.time = float(result["time"]) if result["time"] is not None else None
+        self.memory = result["memory"]
+        if result.get("tests") is not None:
+            tests = []
+            for case in result["tests"]:
+                record = ResultRecord()
+                record.fill(case)
+                tests.append(record)
+            self.tests = tuple(tests)
+
+    def to_dict(self) -> dict:
+        data = {
+            "status": STATUS_JSON[self.status],
+            "stdout": unpack_output(self.stdout),
+            "stderr": unpack_output(self.stderr),
+            "time": str(self.time) if self.time is not None else None,
+            "memory": self.memory,
+        }
+        if self.created_at:
+            data["created_at"] = self.created_at
+        if self.tests is not None:
+            data["tests"] = [t.to_dict() for t in self.tests]
+        return data
 
 
 # ─── Execution ───────────────────────────────────────────────────────────────
 
-async def run_python(code: str, stdin: str, time_limit: float) -> dict:
-    """Execute Python code in a subprocess. Returns result dict."""
+class OutputLimitExceeded(Exception):
+    """A run wrote more than its output limit to one stream."""
+
+
+async def read_stream(
+    stream: asyncio.StreamReader, trace: Trace | None = None, limit: int | None = None
+) -> bytes:
+    """Read to EOF, marking first_output on the trace when the first bytes arrive."""
+    chunks = []
+    total = 0
+    while chunk := await stream.read(65536):
+        if trace is not None:
+            trace.mark("first_output")
+        total += len(chunk)
+        if limit is not None and total > limit:
+            raise OutputLimitExceeded(limit)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def kill_group(pid: int):
+    """SIGKILL a run's whole process group, so anything it forked dies with it."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def address_space_limit(limit_bytes: int):
+    """preexec_fn capping the child's RLIMIT_AS, so a runaway allocation fails with MemoryError."""
+    def apply():
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    return apply
+
+
+async def run_python(
+    code: str,
+    stdin: str,
+    time_limit: float,
+    stdin_file: BinaryIO | None = None,
+    trace: Trace | None = None,
+    cwd: str | None = None,
+    output_limit: int | None = MAX_OUTPUT_BYTES,
+    memory_limit_mb: int | None = None,
+) -> dict:
+    """Execute Python code in a subprocess. Returns result dict.
+
+    When `stdin_file` is given the child reads it directly as fd 0 instead of
+    going through a pipe, so spooled uploads are never copied into this process.
+    The child leads its own process group, which is killed when the run ends.
+    With `memory_limit_mb` the child's address space is capped at that much on
+    top of INTERPRETER_MEMORY_MB.
+    """
     start = time.monotonic()
+    preexec_fn = None
+    if memory_limit_mb is not None:
+        preexec_fn = address_space_limit((INTERPRETER_MEMORY_MB + memory_limit_mb) * 1024 * 1024)
     try:
         proc = await asyncio.create_subprocess_exec(
             "python3", "-c", code,
-            stdin=asyncio.subprocess.PIPE,
+            stdin=stdin_file if stdin_file is not None else asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            start_new_session=True,
+            preexec_fn=preexec_fn,
         )
-        stdin_bytes = stdin.encode() if stdin else b""
+        if trace is not None:
+            trace.mark("process_started")
+
+        async def feed_stdin():
+            if stdin_file is not None:
+                return
+            try:
+                if stdin:
+                    proc.stdin.write(stdin.encode())
+                    await proc.stdin.drain()
+                proc.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # child exited without reading all of its stdin
+
         try:
-            stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                proc.communicate(stdin_bytes),
+            _, stdout_bytes, stderr_bytes, _ = await asyncio.wait_for(
+                asyncio.gather(
+                    feed_stdin(),
+                    read_stream(proc.stdout, trace, output_limit),
+                    read_stream(proc.stderr, trace, output_limit),
+                    proc.wait(),
+                ),
                 timeout=time_limit,
             )
         except asyncio.TimeoutError:
-            try:
-                proc.kill()
-            except ProcessLookupError:
-                pass
-            return {
-                "status": {"id": 5, "description": "Time Limit Exceeded"},
-                "stdout": None,
-                "stderr": None,
-                "time": str(round(time_limit, 3)),
-                "memory": None,
-            }
+            return time_limit_result(time_limit)
+        except OutputLimitExceeded as e:
+            return output_limit_result(e.args[0], round(time.monotonic() - start, 3))
+        finally:
+            kill_group(proc.pid)  # also reaps stragglers that closed their stdio but kept running
 
+        if trace is not None:
+            trace.mark("exited")
         elapsed = round(time.monotonic() - start, 3)
-        stdout = stdout_bytes.decode(errors="replace") or None
-        stderr = stderr_bytes.decode(errors="replace") or None
-
-        if proc.returncode == 0:
-            return {
-                "status": {"id": 3, "description": "Accepted"},
-                "stdout": stdout,
-                "stderr": stderr,
-                "time": str(elapsed),
-                "memory": None,
-            }
-        else:
-            return {
-                "status": {"id": 11, "description": "Runtime Error (NZEC)"},
-                "stdout": stdout,
-                "stderr": stderr,
-                "time": str(elapsed),
-                "memory": None,
-            }
+        return finished_result(proc.returncode == 0, stdout_bytes, stderr_bytes, elapsed)
     except Exception as e:
+        return internal_error_result(e)
+
+
+def finished_result(ok: bool, stdout_bytes: bytes, stderr_bytes: bytes, elapsed: float) -> dict:
+    stdout = stdout_bytes.decode(errors="replace") or None
+    stderr = stderr_bytes.decode(errors="replace") or None
+
+    if ok:
         return {
-            "status": {"id": 13, "description": "Internal Error"},
-            "stdout": None,
-            "stderr": str(e),
-            "time": None,
+            "status": {"id": 3, "description": "Accepted"},
+            "stdout": stdout,
+            "stderr": stderr,
+            "time": str(elapsed),
             "memory": None,
         }
+    else:
+        return {
+            "status": {"id": 11, "description": "Runtime Error (NZEC)"},
+            "stdout": stdout,
+            "stderr": stderr,
+            "time": str(elapsed),
+            "memory": None,
+        }
+
+
+def time_limit_result(time_limit: float) -> dict:
+    return {
+        "status": {"id": 5, "description": "Time Limit Exceeded"},
+        "stdout": None,
+        "stderr": None,
+        "time": str(round(time_limit, 3)),
+        "memory": None,
+    }
+
+
+def output_limit_result(limit: int, elapsed: float) -> dict:
+    return {
+        "status": {"id": 8, "description": "Runtime Error (SIGXFSZ)"},
+        "stdout": None,
+        "stderr": f"Output limit exceeded: more than {limit} bytes written to one stream\n",
+        "time": str(elapsed),
+        "memory": None,
+    }
+
+
+def internal_error_result(e: Exception) -> dict:
+    return {
+        "status": {"id": 13, "description": "Internal Error"},
+        "stdout": None,
+        "stderr": str(e),
+        "time": None,
+        "memory": None,
+    }
+
+
+# ─── Preambles ───────────────────────────────────────────────────────────────
+#
+# A registered preamble is executed once in a long-lived "zygote" interpreter.
+# Each run asks the zygote to fork(); the child inherits the initialized
+# globals copy-on-write, swaps in the run's stdio and execs the submission.
+# Protocol over a unix socket: 8-byte length + JSON payload with the child's
+# stdin/stdout/stderr/status fds attached (SCM_RIGHTS); the zygote replies with
+# the child pid. The child writes its exit code to the status fd before exiting.
+
+ZYGOTE_SOURCE = r"""
+import json, os, resource, signal, socket, struct, sys, traceback
+
+sock = socket.socket(fileno=int(sys.argv[1]))
+
+def recv_exactly(n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise EOFError
+        buf += chunk
+    return buf
+
+def report(status, message=b""):
+    sock.sendall(struct.pack("!BQ", status, len(message)) + message)
+
+def trimmed_traceback(e):
+    # Drop this file's own frame so tracebacks read like `python3 -c`
+    return "".join(traceback.format_exception(type(e), e, e.__traceback__.tb_next))
 
+namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+try:
+    exec(compile(sys.stdin.read(), "<preamble>", "exec"), namespace)
+except BaseException as e:
+    report(1, trimmed_traceback(e).encode())
+    sys.exit(1)
+sys.stdout.flush()
+report(0)
 
-async def process_submission(token: str, code: str, stdin: str, time_limit: float, user_id: str):
-    """Acquire semaphore, run, store result, decrement user depth."""
+signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # children are reaped automatically
+while True:
     try:
-        async with semaphore:
-            results[token]["status"] = {"id": 2, "description": "Processing"}
-            result = await run_python(code, stdin, time_limit)
-            results[token].update(result)
+        header, fds, _, _ = socket.recv_fds(sock, 8, 4)
+        if len(header) < 8:
+            header += recv_exactly(8 - len(header))
+        (length,) = struct.unpack("!Q", header)
+        request = json.loads(recv_exactly(length))
+    except (EOFError, ConnectionError, struct.error):
+        break
+    pid = os.fork()
+    if pid == 0:
+        sock.close()
+        os.setsid()  # own process group, killed as a whole when the run ends
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for target, fd in enumerate(fds[:3]):
+            os.dup2(fd, target)
+        status_fd = fds[3]
+        for fd in fds[:3]:
+            os.close(fd)
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        if request.get("memory_limit_mb") is not None:
+            # Like test cases: budget on top of the warm state inherited from the zygote
+            with open("/proc/self/statm") as f:
+                base_bytes = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+            limit = base_bytes + request["memory_limit_mb"] * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        code = 0
+        try:
+            exec(compile(request["code"], "<string>", "exec"), namespace)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException as e:
+            sys.stderr.write(trimmed_traceback(e))
+            code = 1
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os.write(status_fd, bytes([code & 0xFF]))
+        os._exit(code)
+    for fd in fds:
+        os.close(fd)
+    sock.sendall(struct.pack("!q", pid))
+"""
+
+
+class PreambleError(Exception):
+    """The preamble itself raised or timed out — carries its traceback or the reason."""
+
+
+class Zygote:
+    """A warm interpreter that has executed one preamble and forks per run."""
+
+    def __init__(self, source: str):
+        parent_sock, child_sock = socket.socketpair()
+        self.sock = parent_sock
+        self.lock = threading.Lock()
+        self.proc = subprocess.Popen(
+            ["python3", "-c", ZYGOTE_SOURCE, str(child_sock.fileno())],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,  # preamble output is not part of any run
+            stderr=subprocess.DEVNULL,
+            pass_fds=[child_sock.fileno()],
+        )
+        child_sock.close()
+        try:
+            self.proc.stdin.write(source.encode())
+            self.proc.stdin.close()
+            self.sock.settimeout(PREAMBLE_TIME_LIMIT)
+            status, length = struct.unpack("!BQ", self._recv_exactly(9))
+            message = self._recv_exactly(length).decode(errors="replace")
+            self.sock.settimeout(None)
+        except TimeoutError:
+            self.close()
+            raise PreambleError(f"Preamble did not finish within {PREAMBLE_TIME_LIMIT:g}s")
+        except BaseException:
+            self.close()
+            raise
+        if status != 0:
+            self.close()
+            raise PreambleError(message)
+
+    def _recv_exactly(self, n: int) -> bytes:
+        buf = b""
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("Zygote exited")
+            buf += chunk
+        return buf
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def fork(self, code: str, fds: list[int], cwd: str | None = None, memory_limit_mb: int | None = None) -> int:
+        """Start one run in a fresh fork. `fds` are the child's stdin, stdout, stderr and status fds."""
+        payload = json.dumps({"code": code, "cwd": cwd, "memory_limit_mb": memory_limit_mb}).encode()
+        with self.lock:
+            socket.send_fds(self.sock, [struct.pack("!Q", len(payload))], fds)
+            self.sock.sendall(payload)
+            (pid,) = struct.unpack("!q", self._recv_exactly(8))
+        return pid
+
+    def close(self):
+        self.sock.close()
+        if self.alive():
+            self.proc.kill()
+            self.proc.wait()
+
+
+# preamble_id -> warm zygote, least recently used first
+zygotes: OrderedDict[str, Zygote] = OrderedDict()
+zygote_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+async def get_zygote(preamble_id: str) -> Zygote:
+    """Return a live zygote for the preamble, starting one (and evicting the LRU) if needed."""
+    async with zygote_locks[preamble_id]:
+        zygote = zygotes.get(preamble_id)
+        if zygote is not None and zygote.alive():
+            zygotes.move_to_end(preamble_id)
+            return zygote
+        if zygote is not None:
+            zygotes.pop(preamble_id).close()
+        zygote = await asyncio.to_thread(Zygote, preambles[preamble_id])
+        zygotes[preamble_id] = zygote
+        while len(zygotes) > MAX_WARM_PREAMBLES:
+            _, evicted = zygotes.popitem(last=False)
+            evicted.close()
+        return zygote
+
+
+async def read_fd(fd: int, trace: Trace | None = None, limit: int | None = None) -> bytes:
+    """Read a pipe to EOF without blocking the event loop. Takes ownership of `fd`."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    transport, _ = await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", buffering=0)
+    )
+    try:
+        return await read_stream(reader, trace, limit)
     finally:
+        transport.close()
+
+
+def write_fd(fd: int, data: bytes):
+    with os.fdopen(fd, "wb") as f:
+        try:
+            f.write(data)
+        except BrokenPipeError:
+            pass  # child exited without reading all of its stdin
+
+
+async def run_with_preamble(
+    preamble_id: str,
+    code: str,
+    stdin: str,
+    time_limit: float,
+    stdin_file: BinaryIO | None = None,
+    trace: Trace | None = None,
+    cwd: str | None = None,
+    output_limit: int | None = MAX_OUTPUT_BYTES,
+    memory_limit_mb: int | None = None,
+) -> dict:
+    """Execute code in a fork of the preamble's zygote. Same result shape as run_python.
+
+    `memory_limit_mb` caps the child's address space on top of the zygote's footprint.
+    """
+    start = time.monotonic()
+    try:
+        zygote = await get_zygote(preamble_id)
+    except PreambleError as e:
+        return finished_result(False, b"", str(e).encode(), round(time.monotonic() - start, 3))
+    except Exception as e:
+        return internal_error_result(e)
+
+    pid = None
+    stdin_writer = None
+    readers: list[asyncio.Task] = []
+    try:
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        status_r, status_w = os.pipe()
+        if stdin_file is not None:
+            in_r, in_w = os.dup(stdin_file.fileno()), None
+        else:
+            in_r, in_w = os.pipe()
+        try:
+            pid = await asyncio.to_thread(
+                zygote.fork, code, [in_r, out_w, err_w, status_w], cwd, memory_limit_mb
+            )
+        finally:
+            for fd in (in_r, out_w, err_w, status_w):
+                os.close(fd)
+        if trace is not None:
+            trace.mark("process_started")
+        if in_w is not None:
+            stdin_writer = asyncio.create_task(asyncio.to_thread(write_fd, in_w, stdin.encode()))
+        readers = [
+            asyncio.create_task(read_fd(out_r, trace, output_limit)),
+            asyncio.create_task(read_fd(err_r, trace, output_limit)),
+            asyncio.create_task(read_fd(status_r)),
+        ]
+        try:
+            stdout_bytes, stderr_bytes, status_bytes = await asyncio.wait_for(
+                asyncio.gather(*readers), timeout=time_limit
+            )
+        except asyncio.TimeoutError:
+            return time_limit_result(time_limit)
+        except OutputLimitExceeded as e:
+            return output_limit_result(e.args[0], round(time.monotonic() - start, 3))
+
+        if trace is not None:
+            trace.mark("exited")
+        elapsed = round(time.monotonic() - start, 3)
+        return finished_result(status_bytes == b"\x00", stdout_bytes, stderr_bytes, elapsed)
+    except Exception as e:
+        return internal_error_result(e)
+    finally:
+        if pid is not None:
+            kill_group(pid)
+        for task in readers:
+            task.cancel()
+        if stdin_writer is not None:
+            await asyncio.gather(stdin_writer, return_exceptions=True)
+
+
+# ─── Isolated test cases ─────────────────────────────────────────────────────
+#
+# The harness below runs as an ordinary program (plain or on top of a
+# preamble). It execs the learner's code once, then forks one child per test
+# case from that initialized state; each child gets its own time and memory
+# limits and calls the entry point. Learner output is redirected to temp
+# files, and a single JSON report is written to the harness's original stdout.
+
+CASES_HARNESS = r"""
+def _zuzu_run_cases():
+    import json, math, os, resource, select, signal, sys, tempfile, time, traceback
+
+    payload = json.loads(sys.stdin.read())
+    # Learner output goes to files; cap each one. Setup sees EFBIG, case children die of SIGXFSZ.
+    output_limit = payload["output_limit"]
+    resource.setrlimit(resource.RLIMIT_FSIZE, (output_limit, output_limit))
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    namespace = dict(globals())
+    namespace.pop("_zuzu_run_cases", None)
+    namespace["__name__"] = "__main__"
+
+    sys.stdout.flush()
+    report = os.fdopen(os.dup(1), "w")
+    setup_out, setup_err = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    os.dup2(setup_out.fileno(), 1)
+    os.dup2(setup_err.fileno(), 2)
+
+    def read_back(f):
+        f.seek(0)
+        return f.read().decode(errors="replace")
+
+    def trimmed_traceback(e):
+        return "".join(traceback.format_exception(type(e), e, e.__traceback__.tb_next))
+
+    def finish(doc):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        doc["setup"]["stdout"] = read_back(setup_out)
+        doc["setup"]["stderr"] = read_back(setup_err)
+        report.write(json.dumps(doc))
+        report.flush()
+
+    try:
+        exec(compile(payload["code"], "<string>", "exec"), namespace)
+        fn = namespace[payload["entry_point"]]
+    except BaseException as e:
+        if isinstance(e, KeyError):
+            sys.stderr.write(f"NameError: name '{payload['entry_point']}' is not defined\n")
+        else:
+            sys.stderr.write(trimmed_traceback(e))
+        finish({"setup": {"ok": False}, "cases": []})
+        return
+
+    time_limit = payload["time_limit"]
+    CASE_GRACE = payload["case_grace"]
+    # RLIMIT_AS counts the whole address space, so budget on top of what setup already mapped
+    with open("/proc/self/statm") as f:
+        base_bytes = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    memory_limit = base_bytes + payload["memory_limit_mb"] * 1024 * 1024
+
+    cases = []
+    for args in payload["cases"]:
+        out, err = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        start = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                os.dup2(out.fileno(), 1)
+                os.dup2(err.fileno(), 2)
+                signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+                # Setup may have ignored or trapped SIGALRM; the case's timer must kill it
+                signal.signal(signal.SIGALRM, signal.SIG_DFL)
+                resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+                cpu_seconds = math.ceil(time_limit)
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+                signal.setitimer(signal.ITIMER_REAL, time_limit)
+                result = fn(*args)
+                print(json.dumps(result, separators=(",", ":")))
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except BaseException as e:
+                sys.stderr.write(trimmed_traceback(e))
+                code = 1
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code)
+
+        pidfd = os.pidfd_open(pid)
+        ready, _, _ = select.select([pidfd], [], [], time_limit + CASE_GRACE)
+        os.close(pidfd)
+        if not ready:
+            os.kill(pid, signal.SIGKILL)
+        _, status, usage = os.wait4(pid, 0)
+        elapsed = round(time.monotonic() - start, 3)
+        killed_for_time = os.WIFSIGNALED(status) and os.WTERMSIG(status) in (
+            signal.SIGALRM, signal.SIGXCPU, signal.SIGKILL,
+        )
+        if not ready or killed_for_time:
+            outcome = "timeout"
+        elif os.WIFSIGNALED(status) and os.WTERMSIG(status) == signal.SIGXFSZ:
+            outcome = "output"
+        elif os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+            outcome = "ok"
+        else:
+            outcome = "error"
+        cases.append({
+            "outcome": outcome,
+            "stdout": read_back(out),
+            "stderr": read_back(err),
+            "time": elapsed,
+            "memory": usage.ru_maxrss,  # KiB
+        })
+        out.close()
+        err.close()
+
+    finish({"setup": {"ok": True}, "cases": cases})
+
+
+_zuzu_run_cases()
+"""
+
+CASE_STATUSES = {
+    "ok": {"id": 3, "description": "Accepted"},
+    "timeout": {"id": 5, "description": "Time Limit Exceeded"},
+    "output": {"id": 8, "description": "Runtime Error (SIGXFSZ)"},
+    "error": {"id": 11, "description": "Runtime Error (NZEC)"},
+}
+
+
+def run_time_limit(body: SubmissionRequest) -> float:
+    """Longest a submission may run: its cpu_time_limit, or in test-case mode
+    setup (one cpu_time_limit) plus the harness's worst case per case, so a
+    case that hangs until it is killed cannot cost the others their results."""
+    if body.test_cases is not None:
+        per_case = body.cpu_time_limit + CASE_GRACE_SECONDS
+        return body.cpu_time_limit + per_case * len(body.test_cases) + 1
+    return body.cpu_time_limit
+
+
+async def run_cases(body: SubmissionRequest, trace: Trace | None = None, cwd: str | None = None) -> dict:
+    """Run body.test_cases in per-case forks. Adds a `tests` list to the usual result shape."""
+    payload = json.dumps({
+        "code": body.source_code,
+        "entry_point": body.entry_point,
+        "cases": body.test_cases,
+        "time_limit": body.cpu_time_limit,
+        "case_grace": CASE_GRACE_SECONDS,
+        "memory_limit_mb": body.memory_limit_mb,
+        "output_limit": MAX_OUTPUT_BYTES,
+    })
+    overall_limit = run_time_limit(body)
+    # The report carries every case's (already capped) output, so it is not capped itself
+    if body.preamble_id is not None:
+        result = await run_with_preamble(
+            body.preamble_id, CASES_HARNESS, payload, overall_limit, trace=trace, cwd=cwd, output_limit=None
+        )
+    else:
+        result = await run_python(CASES_HARNESS, payload, overall_limit, trace=trace, cwd=cwd, output_limit=None)
+    if result["status"]["id"] != 3:
+        return result
+
+    try:
+        report = json.loads(result["stdout"])
+    except (TypeError, ValueError):
+        return internal_error_result(Exception(f"Malformed harness report: {result['stderr']}"))
+    setup = report["setup"]
+    result["stdout"] = setup["stdout"] or None
+    result["stderr"] = setup["stderr"] or None
+    if not setup["ok"]:
+        result["status"] = CASE_STATUSES["error"]
+        return result
+    result["tests"] = [
+        {
+            "status": CASE_STATUSES[case["outcome"]],
+            "stdout": case["stdout"] or None,
+            "stderr": case["stderr"] or None,
+            "time": str(case["time"]),
+            "memory": case["memory"],
+        }
+        for case in report["cases"]
+    ]
+    return result
+
+
+async def process_submission(
+    token: str,
+    body: SubmissionRequest,
+    user_id: str,
+    trace: Trace,
+    reserved: float,
+    stdin_file: BinaryIO | None = None,
+):
+    """Acquire semaphore, run, store result, settle the CPU reservation, decrement user depth."""
+    workdir = None
+    seconds = None
+    try:
+        async with semaphore.slot():
+            trace.mark("slot_acquired")
+            results[token].status = Status.PROCESSING
+            try:
+                # A dataset can still expire between admission and here
+                if body.datasets:
+                    workdir = make_workdir(body.datasets)
+            except Exception as e:
+                result = internal_error_result(e)
+            else:
+                if body.test_cases is not None:
+                    result = await run_cases(body, trace, workdir)
+                elif body.preamble_id is not None:
+                    result = await run_with_preamble(
+                        body.preamble_id, body.source_code, body.stdin, body.cpu_time_limit, stdin_file, trace, workdir,
+                        memory_limit_mb=body.memory_limit_mb,
+                    )
+                else:
+                    result = await run_python(
+                        body.source_code, body.stdin, body.cpu_time_limit, stdin_file, trace, workdir,
+                        memory_limit_mb=body.memory_limit_mb,
+                    )
+            results[token].fill(result)
+            trace.mark("result_stored")
+        if result["time"] is not None:
+            seconds = float(result["time"])
+    finally:
+        cpu_ledger.settle(user_id, reserved, seconds)
+        if stdin_file is not None:
+            stdin_file.close()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
         user_depth[user_id] = max(0, user_depth[user_id] - 1)
 
 
+# ─── Bulk jobs ───────────────────────────────────────────────────────────────
+#
+# A job verifies a whole manifest of problems (reference solution + cases).
+# Each problem is one isolated-cases run; problems run in parallel up to
+# bulk_slots and queue behind interactive submissions for execution slots.
+
+class Job:
+    def __init__(self, job_id: str, request: JobRequest):
+        self.id = job_id
+        self.request = request
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.problems: list[dict] = []  # reports, in completion order
+        self.events: list[dict] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def publish(self, event: dict):
+        self.events.append(event)
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_events(self, seen: int):
+        if len(self.events) == seen and not self.done:
+            await self._changed.wait()
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": "done" if self.done else "running",
+            "total": len(self.request.problems),
+            "completed": len(self.problems),
+            "failed": sum(1 for p in self.problems if not p["ok"]),  # a case errored or timed out
+            "wall_ms": round(((self.finished_at or time.time()) - self.created_at) * 1000, 1),
+            "problems": self.problems,
+        }
+
+
+# job_id -> job
+jobs: dict[str, Job] = {}
+
+
+def problem_report(problem: JobProblem, result: dict, queue_ms: float, run_ms: float) -> dict:
+    """Each case's raw outcome. Pass/fail is decided by the client with JSON.stringify,
+    the same rule runTests() in judge0.ts applies to learners, which Python's json
+    module cannot reproduce exactly (2.0 vs 2, non-ASCII escaping)."""
+    cases = result.get("tests") or []
+    tests = []
+    for i, tc in enumerate(problem.test_cases):
+        case = cases[i] if i < len(cases) else None
+        source = case if case is not None else result
+        tests.append({
+            "description": tc.description,
+            "status": source["status"],
+            "stdout": source["stdout"] if case is not None else None,
+            "stderr": source["stderr"],
+            "time": case["time"] if case is not None else None,
+        })
+    return {
+        "id": problem.id,
+        "ok": all(t["status"]["id"] == 3 for t in tests),  # every case ran to completion
+        "status": result["status"],
+        "tests": tests,
+        "queue_ms": queue_ms,
+        "run_ms": run_ms,
+    }
+
+
+async def run_job_problem(job: Job, problem: JobProblem):
+    queued = time.monotonic()
+    async with bulk_slots, semaphore.slot(bulk=True):
+        started = time.monotonic()
+        body = SubmissionRequest(
+            source_code=problem.solution_code,
+            entry_point=problem.entry_point,
+            test_cases=[tc.args for tc in problem.test_cases],
+            cpu_time_limit=job.request.cpu_time_limit,
+            preamble_id=problem.preamble_id,
+        )
+        workdir = None
+        try:
+            # A dataset may have expired since the job was validated
+            if problem.datasets:
+                workdir = make_workdir(problem.datasets)
+            result = await run_cases(body, cwd=workdir)
+        except Exception as e:
+            result = internal_error_result(e)
+        finally:
+            if workdir is not None:
+                shutil.rmtree(workdir, ignore_errors=True)
+    finished = time.monotonic()
+    report = problem_report(
+        problem,
+        result,
+        queue_ms=round((started - queued) * 1000, 1),
+        run_ms=round((finished - started) * 1000, 1),
+    )
+    job.problems.append(report)
+    job.publish({"type": "problem", "completed": len(job.problems), "total": len(job.request.problems), **report})
+
+
+async def run_job(job: Job):
+    try:
+        # Problems record their own failures; never finish the job while others still run
+        await asyncio.gather(*(run_job_problem(job, p) for p in job.request.problems), return_exceptions=True)
+    finally:
+        job.finished_at = time.time()
+        job.publish({"type": "done", **job.summary()})
+
+
+# ─── Uploads ─────────────────────────────────────────────────────────────────
+
+async def spool_upload(request: Request, directory: str, max_bytes: int) -> tuple[str, str, int]:
+    """Stream the request body to a file named by its sha256. Returns (id, path, size).
+
+    The body is consumed chunk by chunk, so large uploads never sit in memory.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+        blob_id = digest.hexdigest()
+        path = os.path.join(directory, blob_id)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return blob_id, path, size
+
+
+async def spool_sealed(request: Request, max_bytes: int) -> tuple[str, int, int]:
+    """Stream the request body into a memfd and seal it. Returns (sha256 id, fd, size).
+
+    Seals are enforced by the kernel for every opener, so runs cannot modify
+    a dataset even though they share this process's uid.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd = os.memfd_create("zuzu-dataset", os.MFD_CLOEXEC | os.MFD_ALLOW_SEALING)
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+            digest.update(chunk)
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+        fcntl.fcntl(
+            fd,
+            fcntl.F_ADD_SEALS,
+            fcntl.F_SEAL_WRITE | fcntl.F_SEAL_SHRINK | fcntl.F_SEAL_GROW | fcntl.F_SEAL_SEAL,
+        )
+    except BaseException:
+        os.close(fd)
+        raise
+    return digest.hexdigest(), fd, size
+
+
+def make_workdir(links: dict[str, str]) -> str:
+    """Create a run's working dir with a symlink per requested dataset.
+
+    Links point at /proc/<executor pid>/fd/<memfd>, so every run opens the
+    same sealed memfd: concurrent readers (including mmap) share its pages
+    and nothing is copied per run.
+    """
+    workdir = tempfile.mkdtemp(dir=RUN_DIR)
+    try:
+        for name, dataset_id in links.items():
+            meta = datasets.get(dataset_id)
+            if meta is None:
+                raise LookupError(f"dataset_id expired: {dataset_id}")
+            meta["last_used"] = time.time()
+            os.symlink(f"/proc/{os.getpid()}/fd/{meta['fd']}", os.path.join(workdir, name))
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    return workdir
+
+
 # ─── Cleanup ─────────────────────────────────────────────────────────────────
 
 async def cleanup_loop():
@@ -122,9 +1290,32 @@ async def cleanup_loop():
         await asyncio.sleep(60)
         try:
             cutoff = time.time() - RESULT_TTL_SECONDS
-            expired = [t for t, r in results.items() if r.get("created_at", 0) < cutoff]
+            expired = [t for t, r in results.items() if r.created_at < cutoff]
+            unfetched = []
             for t in expired:
                 results.pop(t, None)
+                trace = open_traces.pop(t, None)
+                if trace is not None:
+                    # Never fetched: often a run the client gave up on, so keep its trace
+                    trace.mark("expired")
+                    unfetched.append(trace)
+            await export_traces(unfetched)
+            finished = [j for j, job in jobs.items() if job.done and job.finished_at < cutoff]
+            for j in finished:
+                jobs.pop(j, None)
+            cpu_ledger.sweep()
+            # Queued submissions hold their own open file, so unlinking is safe
+            stale = [b for b, meta in stdin_blobs.items() if meta["last_used"] < cutoff]
+            for b in stale:
+                meta = stdin_blobs.pop(b)
+                try:
+                    os.unlink(meta["path"])
+                except FileNotFoundError:
+                    pass
+            # Runs that already opened an expired dataset keep their own reference
+            dataset_cutoff = time.time() - DATASET_TTL_SECONDS
+            for d in [d for d, meta in datasets.items() if meta["last_used"] < dataset_cutoff]:
+                os.close(datasets.pop(d)["fd"])
         except Exception:
             pass  # never let cleanup crash stop the loop
 
@@ -138,28 +1329,99 @@ async def submit(
     x_user_id: str | None = Header(default=None),
 ):
     check_auth(x_api_key)
+    token = str(uuid.uuid4())
     user_id = x_user_id or "anonymous"
+    trace = Trace(token, user_id)
 
+    retry_after = cpu_ledger.retry_after(user_id)
+    if retry_after is not None:
+        reserved = cpu_ledger.reserved(user_id)
+        if reserved >= cpu_ledger.used(user_id):
+            # Mostly time limits of runs still queued or running, not time actually spent
+            reason = (
+                f"Too much work in flight ({reserved:g}s of time limits reserved, "
+                f"{CPU_QUOTA_SECONDS + CPU_BURST_SECONDS:g}s allowed)."
+            )
+        else:
+            reason = f"CPU quota exhausted ({CPU_QUOTA_SECONDS:g}s per {CPU_QUOTA_WINDOW_SECONDS:g}s)."
+        raise HTTPException(
+            status_code=429,
+            detail=f"{reason} Retry in {math.ceil(retry_after)}s.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
     if user_depth[user_id] >= MAX_QUEUE_PER_USER:
         raise HTTPException(
             status_code=429,
             detail=f"Too many concurrent submissions. Max {MAX_QUEUE_PER_USER} per user.",
         )
 
-    token = str(uuid.uuid4())
-    results[token] = {
-        "status": {"id": 1, "description": "In Queue"},
-        "stdout": None,
-        "stderr": None,
-        "time": None,
-        "memory": None,
-        "created_at": time.time(),
-    }
+    if body.preamble_id is not None and body.preamble_id not in preambles:
+        raise HTTPException(status_code=404, detail="preamble_id not found")
+
+    if body.test_cases is not None:
+        if body.entry_point is None or not ENTRY_POINT_RE.match(body.entry_point):
+            raise HTTPException(status_code=400, detail=f"Invalid entry_point: {body.entry_point}")
+        if body.stdin or body.stdin_id is not None:
+            raise HTTPException(status_code=400, detail="stdin is not supported with test_cases")
+
+    for name, dataset_id in (body.datasets or {}).items():
+        if not DATASET_NAME_RE.match(name):
+            raise HTTPException(status_code=400, detail=f"Invalid dataset file name: {name}")
+        if dataset_id not in datasets:
+            raise HTTPException(status_code=404, detail=f"dataset_id not found: {dataset_id}")
+        # Counts as use, so the TTL sweep cannot close it while the run waits for a slot
+        datasets[dataset_id]["last_used"] = time.time()
+
+    stdin_file = None
+    if body.stdin_id is not None:
+        if body.stdin:
+            raise HTTPException(status_code=400, detail="Pass either stdin or stdin_id, not both")
+        blob = stdin_blobs.get(body.stdin_id)
+        if blob is None:
+            raise HTTPException(status_code=404, detail="stdin_id not found")
+        blob["last_used"] = time.time()
+        # A fresh open file per submission gives each run its own read offset
+        stdin_file = open(blob["path"], "rb")
+
+    results[token] = ResultRecord(int(time.time()))
     user_depth[user_id] += 1
-    asyncio.create_task(process_submission(token, body.source_code, body.stdin, body.cpu_time_limit, user_id))
+    reserved = run_time_limit(body)
+    cpu_ledger.reserve(user_id, reserved)
+    traces.append(trace)
+    open_traces[token] = trace
+    trace.mark("enqueued")
+    asyncio.create_task(process_submission(token, body, user_id, trace, reserved, stdin_file))
     return {"token": token}
 
 
+@app.post("/stdin")
+async def upload_stdin(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    """Spool a raw (optionally chunked) request body for reuse as stdin across submissions."""
+    check_auth(x_api_key)
+    stdin_id, path, size = await spool_upload(request, STDIN_DIR, MAX_STDIN_BYTES)
+    stdin_blobs[stdin_id] = {"path": path, "size": size, "last_used": time.time()}
+    return {"stdin_id": stdin_id, "size": size}
+
+
+@app.post("/datasets")
+async def upload_dataset(
+    request: Request,
+    x_api_key: str | None = Header(default=None),
+):
+    """Store a raw request body as a shared read-only dataset, keyed by its sha256."""
+    check_auth(x_api_key)
+    dataset_id, fd, size = await spool_sealed(request, MAX_DATASET_BYTES)
+    if dataset_id in datasets:
+        os.close(fd)  # identical content is already stored
+    else:
+        datasets[dataset_id] = {"fd": fd, "size": size}
+    datasets[dataset_id]["last_used"] = time.time()
+    return {"dataset_id": dataset_id, "size": size}
+
+
 @app.get("/submissions/{token}")
 async def get_submission(
     token: str,
@@ -169,9 +1431,133 @@ async def get_submission(
     result = results.get(token)
     if result is None:
         raise HTTPException(status_code=404, detail="Token not found")
-    return result
+    if result.status >= Status.ACCEPTED and token in open_traces:
+        trace = open_traces.pop(token)
+        trace.mark("first_fetched")
+        await export_traces([trace])
+    return result.to_dict()
+
+
+@app.post("/preambles")
+async def register_preamble(
+    body: PreambleRequest,
+    x_api_key: str | None = Header(default=None),
+):
+    """Register shared setup code by content hash and warm a zygote for it."""
+    check_auth(x_api_key)
+    preamble_id = hashlib.sha256(body.source_code.encode()).hexdigest()
+    if preamble_id not in preambles:
+        preambles[preamble_id] = body.source_code
+        try:
+            await get_zygote(preamble_id)
+        except PreambleError as e:
+            preambles.pop(preamble_id, None)
+            raise HTTPException(status_code=422, detail=f"Preamble failed:\n{e}")
+        except Exception:
+            pass  # warming is best effort; the first run will retry
+    return {"preamble_id": preamble_id}
+
+
+@app.post("/jobs")
+async def create_job(
+    body: JobRequest,
+    x_api_key: str | None = Header(default=None),
+):
+    """Verify a manifest of problems at bulk priority. Poll GET /jobs/{id} or stream /events."""
+    check_auth(x_api_key)
+    if not body.problems:
+        raise HTTPException(status_code=400, detail="Job requires at least one problem")
+    ids = [problem.id for problem in body.problems]
+    duplicates = sorted({i for i in ids if ids.count(i) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate problem ids: {', '.join(duplicates)}")
+    for problem in body.problems:
+        if not ENTRY_POINT_RE.match(problem.entry_point):
+            raise HTTPException(status_code=400, detail=f"Invalid entry_point in {problem.id}: {problem.entry_point}")
+        if not problem.test_cases:
+            raise HTTPException(status_code=400, detail=f"Problem {problem.id} has no test cases")
+        if problem.preamble_id is not None and problem.preamble_id not in preambles:
+            raise HTTPException(status_code=404, detail=f"preamble_id not found for {problem.id}")
+        for name, dataset_id in (problem.datasets or {}).items():
+            if not DATASET_NAME_RE.match(name):
+                raise HTTPException(status_code=400, detail=f"Invalid dataset file name {name} for {problem.id}")
+            if dataset_id not in datasets:
+                raise HTTPException(status_code=404, detail=f"dataset_id not found for {problem.id}: {dataset_id}")
+            datasets[dataset_id]["last_used"] = time.time()
+    if sum(1 for job in jobs.values() if not job.done) >= MAX_ACTIVE_JOBS:
+        raise HTTPException(status_code=429, detail=f"Too many active jobs. Max {MAX_ACTIVE_JOBS}.")
+
+    job = Job(str(uuid.uuid4()), body)
+    jobs[job.id] = job
+    asyncio.create_task(run_job(job))
+    return {"job_id": job.id, "total": len(body.problems)}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.summary()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    x_api_key: str | None = Header(default=None),
+):
+    """NDJSON stream: one event per finished problem, then a final `done` event with the full report."""
+    check_auth(x_api_key)
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        seen = 0
+        while True:
+            while seen < len(job.events):
+                yield json.dumps(job.events[seen]) + "\n"
+                seen += 1
+            if job.done:
+                return
+            await job.wait_for_events(seen)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/users/{user_id}/usage")
+async def get_usage(
+    user_id: str,
+    x_api_key: str | None = Header(default=None),
+):
+    check_auth(x_api_key)
+    return {"user_id": user_id, "in_flight": user_depth.get(user_id, 0), **cpu_ledger.usage(user_id)}
+
+
+@app.get("/debug/traces")
+async def debug_traces(
+    limit: int = 100,
+    x_api_key: str | None = Header(default=None),
+):
+    """Most recent submission traces, newest first."""
+    check_auth(x_api_key)
+    recent = list(traces)[-limit:] if limit > 0 else []
+    return {"traces": [t.to_dict() for t in reversed(recent)]}
 
 
 @app.get("/health")
 async def health():
-    return {"ok": True, "slots_available": semaphore._value, "results_cached": len(results)}
+    return {
+        "ok": True,
+        "node_id": NODE_ID,
+        "max_concurrent": MAX_CONCURRENT,
+        "slots_available": semaphore.available,
+        "queued": semaphore.queued,
+        "in_flight": sum(user_depth.values()),  # queued + running
+        "results_cached": len(results),
+        "warm_preambles": len(zygotes),
+    }
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Parse and extraction time: the old BeautifulSoup extractor vs the lxml single pass.
+
+    python bench_extract.py [--corpus DIR] [--repeat 20]
+
+DIR holds saved course pages: *.html files (searched recursively) or the
+scraper's HTTP cache, whose *.body files are the raw pages as served. The
+default is the scraper's cache when it has pages, so after one online
+`scrape.py` run the benchmark measures the real site. Failing that, pages
+shaped like the docs site's (nav chrome, admonitions, nested lists,
+highlighted code) are rebuilt from the markdown committed next to this script.
+"""
+
+import argparse
+import html
+import json
+import time
+from pathlib import Path
+from bs4 import BeautifulSoup
+
+from scrape import CACHE_DIR, OUTPUT_DIR, find_main, to_markdown
+
+CHROME = (
+    "<html><head><script>var cfg = {};</script><style>body {}</style></head><body>"
+    "<header><nav>" + "".join(f"<a href='#'>Menu {i}</a>" for i in range(200)) + "</nav></header>"
+    "<div class='md-content'><article>{body}</article></div>"
+    "<aside>" + "<p>toc entry</p>" * 50 + "</aside><footer>footer</footer></body></html>"
+)
+
+
+def bs4_extract(soup) -> str:
+    """The previous extract_content() after parsing, kept as the baseline."""
+    main = soup.find("main") or soup.find("article") or soup.find(class_="content")
+    if not main:
+        main = soup.body
+    for tag in main.find_all(["nav", "aside", "footer", "script", "style"]):
+        tag.decompose()
+    lines = []
+    for elem in main.find_all(["h1", "h2", "h3", "h4", "p", "li", "pre", "code"]):
+        text = elem.get_text(strip=True)
+        if not text:
+            continue
+        if elem.name in ("h1", "h2", "h3", "h4"):
+            lines.append(f"{'#' * int(elem.name[1])} {text}\n")
+        elif elem.name == "li":
+            lines.append(f"- {text}")
+        elif elem.name in ("pre", "code") and len(text) > 50:
+            lines.append(f"\n```\n{text}\n```\n")
+        else:
+            lines.append(text)
+    return "\n".join(lines)
+
+
+def page_from_markdown(md: str) -> str:
+    parts, in_list, in_code = [], False, False
+    for line in md.splitlines():
+        if line.startswith("```"):
+            parts.append("</code></pre></td></tr></table>" if in_code else
+                         "<table class='highlighttable'><tr><td class='linenos'><pre>1</pre></td><td><pre><code>")
+            in_code = not in_code
+            continue
+        if in_code:
+            parts.append(f"<span class='n'>{html.escape(line)}</span>\n")
+            continue
+        if in_list and not line.startswith("- "):
+            parts.append("</ul>")
+            in_list = False
+        text = html.escape(line.lstrip("#- ").strip())
+        if not text:
+            continue
+        if line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            parts.append(f"<h{level}>{text}<a class='headerlink' href='#'>#</a></h{level}>")
+        elif line.startswith("- "):
+            if not in_list:
+                parts.append("<ul>")
+                in_list = True
+            words = text.split(" ")
+            half = len(words) // 2
+            parts.append(f"<li><p>{' '.join(words[:half])} <code>{' '.join(words[half:])}</code></p></li>")
+        else:
+            parts.append(f"<div class='admonition'><p>{text} <a href='#'>link</a> <strong>bold</strong></p></div>")
+    return CHROME.replace("{body}", "".join(parts))
+
+
+def cached_pages(directory: Path) -> list[str]:
+    """HTML bodies from an HttpCache directory; sitemaps and other responses are skipped."""
+    pages = []
+    for body_path in sorted(directory.glob("*.body")):
+        try:
+            encoding = json.loads(body_path.with_suffix(".json").read_text()).get("encoding") or "utf-8"
+        except (OSError, ValueError):
+            encoding = "utf-8"
+        text = body_path.read_bytes().decode(encoding, errors="replace")
+        if "<html" in text[:2048].lower():
+            pages.append(text)
+    return pages
+
+
+def load_corpus(corpus: Path | None) -> tuple[str, list[str]]:
+    """(description, pages)."""
+    if corpus is not None:
+        pages = [p.read_text() for p in sorted(corpus.rglob("*.html"))] + cached_pages(corpus)
+        return str(corpus), pages
+    if CACHE_DIR.is_dir():
+        pages = cached_pages(CACHE_DIR)
+        if pages:
+            return f"scraper cache {CACHE_DIR}", pages
+    return "synthetic", [page_from_markdown(p.read_text()) for p in sorted(OUTPUT_DIR.glob("level-*/*.md"))]
+
+
+def timed(fn, pages: list, repeat: int) -> tuple[float, list]:
+    best, out = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = [fn(page) for page in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, help="directory of saved *.html pages or an HTTP cache")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    source, pages = load_corpus(args.corpus)
+    if not pages:
+        parser.error(f"no pages found in {source}")
+    size = sum(len(p) for p in pages)
+    print(f"{source}: {len(pages)} pages, {size / 1024:.0f} KiB, best of {args.repeat}")
+
+    old_parse, soups = timed(lambda page: BeautifulSoup(page, "html.parser"), pages, args.repeat)
+    old_extract, _ = timed(bs4_extract, soups, 1)  # decompose() mutates, so a single pass
+    new_parse, mains = timed(find_main, pages, args.repeat)
+    new_extract, _ = timed(to_markdown, mains, args.repeat)
+
+    print(f"{'':<18}{'parse ms':>10}{'extract ms':>12}{'total ms':>10}")
+    for name, parse, extract in (
+        ("bs4 html.parser", old_parse, old_extract),
+        ("lxml single pass", new_parse, new_extract),
+    ):
+        print(f"{name:<18}{parse * 1000:>10.1f}{extract * 1000:>12.1f}{(parse + extract) * 1000:>10.1f}")
+    print(f"speedup {(old_parse + old_extract) / (new_parse + new_extract):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
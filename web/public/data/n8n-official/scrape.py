@@ -1,122 +1,512 @@
 #!/usr/bin/env python3
 """Scrape n8n course documentation and save as markdown files."""
 
-import requests
-from bs4 import BeautifulSoup
-from pathlib import Path
+import argparse
+import asyncio
+import gzip
+import hashlib
 import json
+import random
+import re
 import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlsplit
+import httpx
+import lxml.etree
+import lxml.html
+
+from search_index import structure_pages, update_index
 
 BASE_URL = "https://docs.n8n.io/courses"
 OUTPUT_DIR = Path(__file__).parent
+USER_AGENT = "Mozilla/5.0 (educational scraper)"
+CONCURRENCY = 4  # requests in flight at once
+RATE_PER_HOST = 2.0  # requests per second to any one host (be polite)
+BURST_PER_HOST = 4
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Raw responses, so extraction can be re-run offline; kept out of the served tree
+CACHE_DIR = Path.home() / ".cache" / "n8n-course-scraper"
+MAX_SITEMAPS = 20  # nested sitemap indexes followed at most
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, up to `burst` at once."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Fetcher:
+    """Pooled keep-alive client with bounded concurrency, per-host rate limits and retries."""
+
+    def __init__(self, concurrency: int = CONCURRENCY, rate: float = RATE_PER_HOST, burst: int = BURST_PER_HOST):
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.slots = asyncio.Semaphore(concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.buckets: dict[str, TokenBucket] = {}
+        self.requests = 0
+        self.retries = 0
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    async def get(self, url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        """GET with exponential backoff (plus jitter) on connection errors, 429 and 5xx.
+
+        A 304 is returned as-is for conditional requests.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            await self.bucket(url).acquire()
+            async with self.slots:
+                self.requests += 1
+                try:
+                    resp = await self.client.get(url, headers=headers)
+                except httpx.TransportError:
+                    if attempt == MAX_RETRIES:
+                        raise
+                    resp = None
+            if resp is not None and (resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES):
+                if resp.status_code != 304:
+                    resp.raise_for_status()
+                return resp
+            self.retries += 1
+            delay = 0.5 * 2 ** attempt + random.uniform(0, 0.25)
+            if resp is not None and resp.headers.get("Retry-After", "").isdigit():
+                delay = max(delay, float(resp.headers["Retry-After"]))
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def aclose(self):
+        await self.client.aclose()
+
 
-# Course structure
-CHAPTERS = {
-    "level-one": [
-        ("chapter-1", "chapter-1/"),
-        ("chapter-2", "chapter-2/"),
-        ("chapter-3", "chapter-3/"),
-        ("chapter-4", "chapter-4/"),
-        ("chapter-5-1", "chapter-5/chapter-5.1/"),
-        ("chapter-5-2", "chapter-5/chapter-5.2/"),
-        ("chapter-5-3", "chapter-5/chapter-5.3/"),
-        ("chapter-5-4", "chapter-5/chapter-5.4/"),
-        ("chapter-5-5", "chapter-5/chapter-5.5/"),
-        ("chapter-5-6", "chapter-5/chapter-5.6/"),
-        ("chapter-5-7", "chapter-5/chapter-5.7/"),
-        ("chapter-5-8", "chapter-5/chapter-5.8/"),
-        ("chapter-6", "chapter-6/"),
-        ("chapter-7", "chapter-7/"),
-    ],
-    "level-two": [
-        ("chapter-1", "chapter-1/"),
-        ("chapter-2", "chapter-2/"),
-        ("chapter-3", "chapter-3/"),
-        ("chapter-4", "chapter-4/"),
-        ("chapter-5-0", "chapter-5/chapter-5.0/"),
-        ("chapter-5-1", "chapter-5/chapter-5.1/"),
-        ("chapter-5-2", "chapter-5/chapter-5.2/"),
-        ("chapter-5-3", "chapter-5/chapter-5.3/"),
-        ("chapter-6", "chapter-6/"),
-    ],
+SKIP_TAGS = {"nav", "aside", "footer", "script", "style", "template", "svg", "button"}
+SKIP_CLASSES = {"headerlink", "linenos"}  # heading permalinks, code line numbers
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 4, "h6": 4}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "blockquote", "figure", "figcaption",
+    "table", "thead", "tbody", "tr", "dl", "dt", "dd", "details", "summary", "br", "hr",
 }
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def skipped(el) -> bool:
+    return el.tag in SKIP_TAGS or not SKIP_CLASSES.isdisjoint((el.get("class") or "").split())
+
+
+class MarkdownWriter:
+    """One pass over the content tree; every text node is emitted exactly once.
+
+    Inline text accumulates until a block boundary flushes it as a line. List
+    items prefix their first line with "- " and indent continuation lines and
+    nested lists under it.
+    """
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.inline: list[str] = []
+        self.items: list[bool] = []  # open <li>s: whether the marker was written yet
+
+    def indent(self) -> str:
+        return "  " * max(0, len(self.items) - 1)
+
+    def flush(self):
+        text = WHITESPACE_RE.sub(" ", "".join(self.inline)).strip()
+        self.inline.clear()
+        if not text:
+            return
+        if self.items and not self.items[-1]:
+            self.items[-1] = True
+            self.lines.append(f"{self.indent()}- {text}")
+        elif self.items:
+            self.lines.append(f"{self.indent()}  {text}")
+        else:
+            self.lines.append(text)
+
+    def walk(self, el):
+        tag = el.tag
+        if tag in HEADINGS:
+            self.flush()
+            self.children(el)
+            text = WHITESPACE_RE.sub(" ", "".join(self.inline)).strip()
+            self.inline.clear()
+            if text:
+                level = HEADINGS[tag]
+                gap = "" if level == 1 else "\n"
+                self.lines.append(f"{gap}{'#' * level} {text}\n")
+        elif tag == "pre":
+            self.flush()
+            raw: list[str] = []
+            self.raw_text(el, raw)
+            code = "".join(raw).strip("\n")
+            if code.strip():
+                self.lines.append(f"\n```\n{code}\n```\n")
+        elif tag == "code":
+            start = len(self.inline)
+            self.children(el)
+            code = "".join(self.inline[start:]).strip()
+            del self.inline[start:]
+            if code:
+                self.inline.append(f"`{code}`")
+        elif tag == "li":
+            self.flush()
+            self.items.append(False)
+            self.children(el)
+            self.flush()
+            self.items.pop()
+        elif tag in ("ul", "ol") or tag in BLOCK_TAGS:
+            self.flush()
+            self.children(el)
+            self.flush()
+        else:
+            if tag in ("td", "th"):
+                self.inline.append(" ")
+            self.children(el)
+
+    def children(self, el):
+        if el.text:
+            self.inline.append(el.text)
+        for child in el:
+            if isinstance(child.tag, str) and not skipped(child):
+                self.walk(child)
+            if child.tail:
+                self.inline.append(child.tail)
+
+    def raw_text(self, el, out: list[str]):
+        """Text under a <pre>, whitespace preserved."""
+        if el.text:
+            out.append(el.text)
+        for child in el:
+            if isinstance(child.tag, str) and not skipped(child):
+                self.raw_text(child, out)
+            if child.tail:
+                out.append(child.tail)
 
 
-def fetch_page(url: str) -> str:
-    """Fetch page content."""
-    headers = {"User-Agent": "Mozilla/5.0 (educational scraper)"}
-    resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
-    return resp.text
+def find_main(html: str):
+    """Parse with lxml and return the main content element."""
+    doc = lxml.html.document_fromstring(html)
+    found = doc.xpath(
+        "(//main | //article | //*[contains(concat(' ', normalize-space(@class), ' '), ' content ')])[1]"
+    )
+    return found[0] if found else doc.body
+
+
+def to_markdown(main) -> str:
+    writer = MarkdownWriter()
+    writer.walk(main)
+    writer.flush()
+    return "\n".join(writer.lines)
 
 
 def extract_content(html: str) -> str:
     """Extract main content as markdown-ish text."""
-    soup = BeautifulSoup(html, "html.parser")
+    return to_markdown(find_main(html))
 
-    # Find main content area
-    main = soup.find("main") or soup.find("article") or soup.find(class_="content")
-    if not main:
-        main = soup.body
 
-    # Remove nav, sidebar, footer
-    for tag in main.find_all(["nav", "aside", "footer", "script", "style"]):
-        tag.decompose()
+class HttpCache:
+    """Raw responses on disk, one body and one JSON metadata file per url."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()[:32]
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def get(self, url: str) -> tuple[dict, bytes] | None:
+        meta_path, body_path = self.paths(url)
+        try:
+            return json.loads(meta_path.read_text()), body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, resp: httpx.Response) -> tuple[dict, bytes]:
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "encoding": resp.encoding,
+            "hash": hashlib.sha256(resp.content).hexdigest(),
+            "fetched_at": time.time(),
+        }
+        meta_path, body_path = self.paths(url)
+        # Body first: a metadata file always points at a complete body
+        for path, data in ((body_path, resp.content), (meta_path, json.dumps(meta).encode())):
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        return meta, resp.content
+
+
+async def fetch_cached(
+    fetcher: Fetcher, cache: HttpCache, url: str, offline: bool, validators: dict | None = None
+) -> tuple[dict, bytes | None, bool]:
+    """Body and validators for `url`. The flag is False when the body came from the cache.
+
+    Online, a cached copy turns the fetch into a conditional request; offline,
+    only the cache is consulted. Without a cached copy, `validators` (etag and
+    last_modified, e.g. from the manifest) still make the request conditional,
+    and a 304 then returns them with no body: the caller's own copy is current.
+    """
+    cached = cache.get(url)
+    if offline:
+        if cached is None:
+            cache.misses += 1
+            raise LookupError("not in cache")
+        cache.hits += 1
+        return *cached, False
+    known = cached[0] if cached is not None else validators or {}
+    headers = {}
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    resp = await fetcher.get(url, headers)
+    if resp.status_code == 304 and cached is not None:
+        cache.hits += 1
+        return *cached, False
+    if resp.status_code == 304 and headers:
+        return known, None, False
+    cache.misses += 1
+    return *cache.put(url, resp), True
+
+
+def natural_key(text: str) -> list:
+    """Sort chapter-10 after chapter-9."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", text)]
+
+
+def normalize(url: str) -> str:
+    url = urldefrag(url)[0].split("?", 1)[0]
+    if url.endswith("index.html"):
+        url = url[: -len("index.html")]
+    return url
 
-    # Extract text with basic structure
-    lines = []
-    for elem in main.find_all(["h1", "h2", "h3", "h4", "p", "li", "pre", "code"]):
-        text = elem.get_text(strip=True)
-        if not text:
-            continue
 
-        if elem.name == "h1":
-            lines.append(f"# {text}\n")
-        elif elem.name == "h2":
-            lines.append(f"\n## {text}\n")
-        elif elem.name == "h3":
-            lines.append(f"\n### {text}\n")
-        elif elem.name == "h4":
-            lines.append(f"\n#### {text}\n")
-        elif elem.name == "li":
-            lines.append(f"- {text}")
-        elif elem.name in ("pre", "code") and len(text) > 50:
-            lines.append(f"\n```\n{text}\n```\n")
+async def sitemap_urls(fetcher: Fetcher, cache: HttpCache, base_url: str, offline: bool) -> list[str]:
+    """Page urls from the site's sitemap.xml, following sitemap indexes."""
+    parts = urlsplit(base_url)
+    pending = [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+    urls: list[str] = []
+    for _ in range(MAX_SITEMAPS):
+        if not pending:
+            break
+        sitemap = pending.pop(0)
+        try:
+            _, body, _ = await fetch_cached(fetcher, cache, sitemap, offline)
+            if body[:2] == b"\x1f\x8b":
+                body = gzip.decompress(body)
+            root = lxml.etree.fromstring(body)
+        except Exception as e:
+            print(f"  Sitemap unavailable: {sitemap}: {e}")
+            continue
+        locs = [loc.strip() for loc in root.xpath("//*[local-name()='loc']/text()")]
+        if lxml.etree.QName(root).localname == "sitemapindex":
+            pending.extend(locs)
         else:
-            lines.append(text)
+            urls.extend(locs)
+    return urls
 
-    return "\n".join(lines)
 
+async def navigation_urls(fetcher: Fetcher, cache: HttpCache, base_url: str, offline: bool) -> list[str]:
+    """Links on the course landing page; the docs theme renders the whole section nav there."""
+    try:
+        _, body, _ = await fetch_cached(fetcher, cache, f"{base_url}/", offline)
+    except Exception as e:
+        print(f"  Navigation unavailable: {e}")
+        return []
+    doc = lxml.html.document_fromstring(body)
+    return [urljoin(f"{base_url}/", href) for href in doc.xpath("//a/@href")]
 
-def scrape_all():
-    """Scrape all chapters."""
-    structure = {"levels": {}}
 
-    for level, chapters in CHAPTERS.items():
-        level_dir = OUTPUT_DIR / level
-        level_dir.mkdir(exist_ok=True)
-        structure["levels"][level] = []
+def page_file(url: str, base_url: str) -> tuple[str, str] | None:
+    """(level, filename) for a page under the prefix: .../level-one/chapter-5/chapter-5.1/ -> chapter-5-1."""
+    parts = [p for p in url[len(base_url):].split("/") if p]
+    if not parts:
+        return None  # the prefix's own landing page
+    level = parts[0]
+    filename = parts[-1].replace(".", "-") if len(parts) > 1 else "index"
+    return level, filename
+
+
+async def discover(
+    fetcher: Fetcher, cache: HttpCache, base_url: str, offline: bool, manifest: dict[str, dict]
+) -> list[str]:
+    """Pages under `base_url`: from the sitemap, else the site navigation, else the last manifest."""
+    prefix = f"{base_url}/"
+    for source, find in (("sitemap", sitemap_urls), ("navigation", navigation_urls)):
+        urls = {normalize(u) for u in await find(fetcher, cache, base_url, offline)}
+        urls = sorted((u for u in urls if u.startswith(prefix) and u != prefix), key=natural_key)
+        if urls:
+            print(f"Discovered {len(urls)} pages from the {source}")
+            return urls
+    print(f"Discovery failed; reusing the {len(manifest)} pages in structure.json")
+    return sorted((u for u in manifest if u.startswith(prefix)), key=natural_key)
+
+
+def load_manifest(output_dir: Path) -> dict[str, dict]:
+    """Entries from the previous structure.json, keyed by url."""
+    try:
+        structure = json.loads((output_dir / "structure.json").read_text())
+    except (OSError, ValueError):
+        return {}
+    return {entry["url"]: entry for entries in structure.get("levels", {}).values() for entry in entries}
+
 
-        for filename, path in chapters:
-            url = f"{BASE_URL}/{level}/{path}"
-            output_file = level_dir / f"{filename}.md"
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text() == text:
+        return False
+    path.write_text(text)
+    return True
 
-            print(f"Fetching: {url}")
-            try:
-                html = fetch_page(url)
-                content = extract_content(html)
-                output_file.write_text(content)
-                structure["levels"][level].append({"file": filename, "url": url})
-                print(f"  Saved: {output_file.name}")
-            except Exception as e:
-                print(f"  Error: {e}")
 
-            time.sleep(0.5)  # Be polite
+async def scrape_page(
+    fetcher: Fetcher,
+    cache: HttpCache,
+    filename: str,
+    url: str,
+    output_file: Path,
+    previous: dict | None,
+    force: bool,
+    offline: bool,
+) -> tuple[dict | None, str]:
+    """Fetch one page and re-extract it only if it changed. Returns its manifest entry and the outcome."""
+    have_copy = previous is not None and output_file.exists() and not force
+    try:
+        # With an empty cache (fresh checkout, CI) the manifest's validators keep the request conditional
+        meta, body, fresh = await fetch_cached(fetcher, cache, url, offline, previous if have_copy else None)
+        if body is None:
+            return previous, "not modified"
+        entry = {
+            "file": filename,
+            "url": url,
+            "etag": meta["etag"],
+            "last_modified": meta["last_modified"],
+            "hash": meta["hash"],
+        }
+        # Servers without validators still send the same bytes for an unchanged page
+        if have_copy and previous.get("hash") == entry["hash"]:
+            return entry, "unchanged" if fresh else "not modified"
+        html = body.decode(meta.get("encoding") or "utf-8", errors="replace")
+        if not write_if_changed(output_file, extract_content(html)):
+            return entry, "unchanged"
+    except Exception as e:
+        print(f"  Error: {url}: {e}")
+        # Keep serving the copy we already have
+        return (previous if previous is not None and output_file.exists() else None), "failed"
+    print(f"  Saved: {output_file.parent.name}/{output_file.name}")
+    return entry, "updated"
+
+
+async def scrape_all(
+    base_url: str = BASE_URL,
+    output_dir: Path = OUTPUT_DIR,
+    concurrency: int = CONCURRENCY,
+    rate: float = RATE_PER_HOST,
+    force: bool = False,
+    cache_dir: Path = CACHE_DIR,
+    offline: bool = False,
+):
+    """Discover and scrape every page under `base_url`, skipping pages unchanged since the last run.
+
+    structure.json doubles as the manifest: each entry records the page's
+    ETag, Last-Modified and a sha256 of its HTML for the next run. Offline
+    runs re-extract every page from the HTTP cache without touching the network.
+    """
+    manifest = load_manifest(output_dir)
+    cache = HttpCache(cache_dir)
+    fetcher = Fetcher(concurrency, rate)
+    start = time.monotonic()
+    try:
+        pages = []
+        for url in await discover(fetcher, cache, base_url, offline, manifest):
+            located = page_file(url, base_url)
+            if located is not None:
+                level, filename = located
+                pages.append((level, filename, url, output_dir / level / f"{filename}.md"))
+        for level in {level for level, _, _, _ in pages}:
+            (output_dir / level).mkdir(parents=True, exist_ok=True)
+        outcomes = await asyncio.gather(*(
+            scrape_page(fetcher, cache, filename, url, out, manifest.get(url), force or offline, offline)
+            for _, filename, url, out in pages
+        ))
+    finally:
+        await fetcher.aclose()
+    elapsed = time.monotonic() - start
+
+    # Keep discovery order regardless of which fetch finished first
+    structure = {"levels": {}}
+    for (level, _, _, _), (entry, _) in zip(pages, outcomes):
+        entries = structure["levels"].setdefault(level, [])
+        if entry is not None:
+            entries.append(entry)
 
     # Save structure
-    (OUTPUT_DIR / "structure.json").write_text(json.dumps(structure, indent=2))
-    print("\nDone! Structure saved to structure.json")
+    counts = Counter(outcome for _, outcome in outcomes)
+    changed = write_if_changed(output_dir / "structure.json", json.dumps(structure, indent=2))
+    lookups = cache.hits + cache.misses
+    print(
+        f"\nDone! {len(pages)} pages in {elapsed:.1f}s "
+        f"({len(pages) / elapsed:.1f} pages/s, {fetcher.requests} requests, {fetcher.retries} retries)"
+    )
+    print(", ".join(f"{counts[k]} {k}" for k in ("updated", "not modified", "unchanged", "failed")))
+    print(
+        f"Cache: {cache.hits} hits, {cache.misses} misses"
+        + (f" ({100 * cache.hits / lookups:.0f}% hit rate)" if lookups else "")
+    )
+    print("Structure saved to structure.json" if changed else "structure.json unchanged")
+    stats = update_index(output_dir, structure_pages(output_dir))
+    print(f"Search index: {stats['indexed']} pages indexed, {stats['removed']} removed, "
+          f"{stats['shards_written']} shards written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--base-url", default=BASE_URL, help="only pages under this prefix are scraped (point at a fixture server to test)"
+    )
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=RATE_PER_HOST, help="requests per second per host")
+    parser.add_argument("--force", action="store_true", help="re-extract every page")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help="on-disk HTTP cache")
+    parser.add_argument("--offline", action="store_true", help="re-extract from the cache without any requests")
+    args = parser.parse_args()
+    asyncio.run(scrape_all(
+        args.base_url.rstrip("/"), args.output_dir, args.concurrency, args.rate, args.force,
+        args.cache_dir, args.offline,
+    ))
 
 
 if __name__ == "__main__":
-    scrape_all()
+    main()
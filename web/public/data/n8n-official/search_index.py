@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Build a static inverted index over the scraped course markdown.
+
+Output, under search/ next to the markdown:
+
+    meta.json       pages (url, title, markdown hash, sections), BM25 constants, shard count
+    shard-XX.json   {term: [page, section, tf, page, section, tf, ...]}
+
+A term lives in shard fnv1a(term) % SHARD_COUNT, so a query costs meta.json
+plus one shard per distinct term. Sections are the units scored; each has
+its heading's anchor so results can deep-link. Page ids are stable across
+builds, so a rebuild re-tokenizes only pages whose markdown changed and
+rewrites only the shards those pages touch; postings are kept in (page,
+section) order, so the result is byte-identical to a --full build. The index
+follows the markdown: rebuild it after re-scraping.
+
+    python search_index.py [--full]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+OUTPUT_DIR = Path(__file__).parent
+INDEX_DIR_NAME = "search"
+SHARD_COUNT = 16
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+HEADING_RE = re.compile(r"^(#{1,6}) (.+)$")
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have if in into is it its of on or that the their then "
+    "this to was we will with you your".split()
+)
+
+
+def fnv1a(text: str) -> int:
+    """32-bit FNV-1a over UTF-8; mirrored by the site's search client."""
+    h = 0x811C9DC5
+    for byte in text.encode():
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def shard_of(term: str) -> int:
+    return fnv1a(term) % SHARD_COUNT
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def slugify(heading: str) -> str:
+    """Heading anchor as the docs site (Python-Markdown toc) generates it."""
+    text = unicodedata.normalize("NFKD", heading).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^\w\s-]", "", text).strip().lower()
+    return re.sub(r"[-\s]+", "-", text)
+
+
+def split_sections(markdown: str) -> list[tuple[str, str, str]]:
+    """(anchor, heading, text) per heading; text before the first h2 belongs to the page top ("")."""
+    sections: list[tuple[str, str, list[str]]] = [("", "", [])]
+    seen: dict[str, int] = {}
+    in_code = False
+    for line in markdown.splitlines():
+        if line.startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING_RE.match(line)
+        if match is None:
+            sections[-1][2].append(line)
+            continue
+        heading = match.group(2).strip()
+        if heading.endswith("#"):  # permalink kept by markdown scraped before headerlinks were skipped
+            heading = heading[:-1].rstrip()
+        if len(match.group(1)) == 1:
+            sections[0] = ("", heading, sections[0][2] + [heading])
+            continue
+        anchor = slugify(heading)
+        if anchor in seen:  # duplicates get _1, _2, ... like the docs site
+            seen[anchor] += 1
+            anchor = f"{anchor}_{seen[anchor]}"
+        else:
+            seen[anchor] = 0
+        sections.append((anchor, heading, [heading]))
+    return [(anchor, heading, "\n".join(lines)) for anchor, heading, lines in sections]
+
+
+def index_page(markdown: str) -> tuple[str, list[list], dict[str, list[tuple[int, int]]]]:
+    """Title, [anchor, heading, length] per section, and term -> [(section, tf)]."""
+    title = ""
+    sections = []
+    postings: dict[str, list[tuple[int, int]]] = {}
+    for number, (anchor, heading, text) in enumerate(split_sections(markdown)):
+        if number == 0:
+            title = heading
+        tokens = tokenize(text)
+        sections.append([anchor, heading, len(tokens)])
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((number, tf))
+    return title, sections, postings
+
+
+def sorted_postings(flat: list[int]) -> list[int]:
+    """Triples ordered by (page, section), so an incremental build writes what --full would."""
+    triples = sorted(flat[i:i + 3] for i in range(0, len(flat), 3))
+    return [v for triple in triples for v in triple]
+
+
+def load_json(path: Path, default):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return default
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text() == text:
+        return False
+    path.write_text(text)
+    return True
+
+
+def update_index(output_dir: Path, pages: list[tuple[str, str]], full: bool = False) -> dict:
+    """Bring search/ in line with `pages` ([(markdown path relative to output_dir, url)]).
+
+    Returns counts of pages re-indexed and removed and shards written.
+    """
+    index_dir = output_dir / INDEX_DIR_NAME
+    index_dir.mkdir(exist_ok=True)
+    meta = load_json(index_dir / "meta.json", {})
+    fresh = full or meta.get("shard_count") != SHARD_COUNT
+    if fresh:
+        meta = {}
+    indexed: dict[str, dict] = meta.get("pages", {})  # page id -> entry
+    by_file = {entry["file"]: int(pid) for pid, entry in indexed.items()}
+
+    # Which pages to (re)tokenize or drop
+    wanted = {file: url for file, url in pages}
+    changed: dict[int, tuple[str, str, str]] = {}  # page id -> (file, url, markdown)
+    next_id = max((int(pid) for pid in indexed), default=-1) + 1
+    for file, url in pages:
+        try:
+            markdown = (output_dir / file).read_text()
+        except OSError:
+            continue
+        digest = hashlib.sha256(markdown.encode()).hexdigest()
+        pid = by_file.get(file)
+        if pid is not None and indexed[str(pid)]["hash"] == digest and indexed[str(pid)]["url"] == url:
+            continue
+        if pid is None:
+            pid, next_id = next_id, next_id + 1
+        changed[pid] = (file, url, markdown)
+    removed = {pid for file, pid in by_file.items() if file not in wanted}
+    stale = removed | (set(changed) & set(by_file.values()))  # pages with postings to drop
+
+    new_postings: dict[int, dict[str, list[tuple[int, int]]]] = {}
+    for pid, (file, url, markdown) in changed.items():
+        title, sections, postings = index_page(markdown)
+        indexed[str(pid)] = {
+            "file": file,
+            "url": url,
+            "title": title,
+            "hash": hashlib.sha256(markdown.encode()).hexdigest(),
+            "sections": sections,
+        }
+        new_postings[pid] = postings
+    for pid in removed:
+        indexed.pop(str(pid), None)
+
+    # Shards are loaded lazily: all of them when old postings must go, else only those gaining terms
+    shards: dict[int, dict[str, list[int]]] = {}
+    touched: set[int] = set(range(SHARD_COUNT)) if fresh else set()
+
+    def shard(number: int) -> dict[str, list[int]]:
+        if number not in shards:
+            shards[number] = {} if fresh else load_json(index_dir / f"shard-{number:02d}.json", {})
+        return shards[number]
+
+    if stale:
+        for number in range(SHARD_COUNT):
+            for term, flat in list(shard(number).items()):
+                kept = [v for i in range(0, len(flat), 3) if flat[i] not in stale for v in flat[i:i + 3]]
+                if len(kept) != len(flat):
+                    touched.add(number)
+                    if kept:
+                        shard(number)[term] = kept
+                    else:
+                        del shard(number)[term]
+    for pid, postings in new_postings.items():
+        for term, entries in postings.items():
+            number = shard_of(term)
+            touched.add(number)
+            flat = shard(number).setdefault(term, [])
+            for section, tf in entries:
+                flat.extend((pid, section, tf))
+
+    written = 0
+    for number in range(SHARD_COUNT):
+        if number in touched or not (index_dir / f"shard-{number:02d}.json").exists():
+            data = {term: sorted_postings(shard(number)[term]) for term in sorted(shard(number))}
+            written += write_if_changed(index_dir / f"shard-{number:02d}.json", json.dumps(data, separators=(",", ":")))
+
+    lengths = [section[2] for entry in indexed.values() for section in entry["sections"]]
+    meta = {
+        "version": 1,
+        "shard_count": SHARD_COUNT,
+        "hash": "fnv1a32",
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "section_count": len(lengths),
+        "avg_section_length": round(sum(lengths) / len(lengths), 3) if lengths else 0,
+        "pages": {pid: indexed[pid] for pid in sorted(indexed, key=int)},
+    }
+    write_if_changed(index_dir / "meta.json", json.dumps(meta, separators=(",", ":")))
+    return {"indexed": len(changed), "removed": len(removed), "shards_written": written}
+
+
+def structure_pages(output_dir: Path) -> list[tuple[str, str]]:
+    structure = load_json(output_dir / "structure.json", {"levels": {}})
+    return [
+        (f"{level}/{entry['file']}.md", entry["url"])
+        for level, entries in structure["levels"].items()
+        for entry in entries
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--full", action="store_true", help="rebuild from scratch")
+    args = parser.parse_args()
+    stats = update_index(args.output_dir, structure_pages(args.output_dir), args.full)
+    print(f"Search index: {stats['indexed']} pages indexed, {stats['removed']} removed, "
+          f"{stats['shards_written']} shards written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+// Client for the static search index built by public/data/n8n-official/search_index.py.
+// A query fetches meta.json once, then one shard per distinct query term.
+
+const INDEX_URL = '/data/n8n-official/search';
+
+const STOPWORDS = new Set(
+  'a an and are as at be by can for from has have if in into is it its of on or that the their then this to was we will with you your'.split(' ')
+);
+
+interface IndexedPage {
+  file: string;
+  url: string;
+  title: string;
+  hash: string;
+  sections: [anchor: string, heading: string, length: number][];
+}
+
+interface IndexMeta {
+  version: number;
+  shard_count: number;
+  k1: number;
+  b: number;
+  section_count: number;
+  avg_section_length: number;
+  pages: Record<string, IndexedPage>;
+}
+
+type Shard = Record<string, number[]>; // term -> [page, section, tf, ...]
+
+export interface SearchHit {
+  title: string;
+  heading: string;
+  url: string; // page url with the section's anchor
+  file: string;
+  score: number;
+}
+
+let metaPromise: Promise<IndexMeta> | null = null;
+const shardCache = new Map<number, Promise<Shard>>();
+
+function fetchJson<T>(path: string): Promise<T> {
+  return fetch(`${INDEX_URL}/${path}`).then(res => {
+    if (!res.ok) throw new Error(`Search index fetch failed: ${path} (${res.status})`);
+    return res.json() as Promise<T>;
+  });
+}
+
+export function tokenize(text: string): string[] {
+  return (text.toLowerCase().match(/[a-z0-9]+/g) ?? []).filter(t => t.length > 1 && !STOPWORDS.has(t));
+}
+
+// 32-bit FNV-1a over UTF-8, matching search_index.fnv1a
+function fnv1a(text: string): number {
+  let h = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(text)) {
+    h = Math.imul(h ^ byte, 0x01000193) >>> 0;
+  }
+  return h;
+}
+
+function loadShard(n: number): Promise<Shard> {
+  let shard = shardCache.get(n);
+  if (!shard) {
+    shard = fetchJson<Shard>(`shard-${String(n).padStart(2, '0')}.json`);
+    shardCache.set(n, shard);
+  }
+  return shard;
+}
+
+export async function searchN8nDocs(query: string, limit = 10): Promise<SearchHit[]> {
+  const terms = [...new Set(tokenize(query))];
+  if (terms.length === 0) return [];
+  metaPromise ??= fetchJson<IndexMeta>('meta.json');
+  const meta = await metaPromise;
+  const shards = await Promise.all(terms.map(t => loadShard(fnv1a(t) % meta.shard_count)));
+
+  // BM25 over sections
+  const scores = new Map<string, number>();
+  terms.forEach((term, i) => {
+    const postings = shards[i][term];
+    if (!postings) return;
+    const df = postings.length / 3;
+    const idf = Math.log(1 + (meta.section_count - df + 0.5) / (df + 0.5));
+    for (let j = 0; j < postings.length; j += 3) {
+      const [page, section, tf] = [postings[j], postings[j + 1], postings[j + 2]];
+      const length = meta.pages[page]?.sections[section]?.[2];
+      if (length === undefined) continue;
+      const norm = meta.k1 * (1 - meta.b + (meta.b * length) / meta.avg_section_length);
+      const key = `${page}:${section}`;
+      scores.set(key, (scores.get(key) ?? 0) + (idf * tf * (meta.k1 + 1)) / (tf + norm));
+    }
+  });
+
+  return [...scores.entries()]
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, limit)
+    .map(([key, score]) => {
+      const [page, section] = key.split(':').map(Number);
+      const entry = meta.pages[page];
+      const [anchor, heading] = entry.sections[section];
+      return {
+        title: entry.title,
+        heading: heading || entry.title,
+        url: anchor ? `${entry.url}#${anchor}` : entry.url,
+        file: entry.file,
+        score,
+      };
+    });
+}